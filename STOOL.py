@@ -1,9 +1,20 @@
 import bpy  # type: ignore
-from .STOOL_part.ParentsOps import SoloPick, SoloPick_delete, P2E, P2E_individual, SelectParent, RAQtoSubparent, CAMERA_OT_create_focus_object
-from .STOOL_part.StageOps import DeleteEmptyNull, ToggleChildrenSelectability, FastCentreCamera, CSPZT_Camera, AddLightWithConstraint, OpenProjectFolderOperator, SaveSelection, LoadSelection
+from .STOOL_part.ParentsOps import SoloPick, SoloPick_delete, P2E, P2E_individual, SelectParent, SelectHierarchy, RAQtoSubparent, CAMERA_OT_create_focus_object
+from .STOOL_part.StageOps import DeleteEmptyNull, ToggleChildrenSelectability, FastCentreCamera, CSPZT_Camera, AddLightWithConstraint, OpenProjectFolderOperator
+from .STOOL_part.SelectionSets import SelectionSetItem, SelectionSet, SelectionSetProperties, SaveSelection, LoadSelection, OBJECT_OT_selection_set_combine, OBJECT_OT_selection_set_remove, OBJECT_OT_selection_set_migrate, OBJECT_UL_selection_sets, register_handlers as register_selection_sets, unregister_handlers as unregister_selection_sets
 from .STOOL_part.AnimeOps import OBJECT_OT_add_noise_anim, NoiseAnimSettings, RemoveAllAnimations
 from .STOOL_part.RenderOps import RenderPresetSettings, RENDER_OT_create_presets, RENDER_OT_apply_preset, RENDER_OT_open_output_folder
+from .STOOL_part.RenderStats import RENDER_OT_export_render_stats, register_handlers as register_render_stats, unregister_handlers as unregister_render_stats
+from .STOOL_part.RenderFarm import RENDER_OT_export_farm_jobs
+from .STOOL_part.RenderWarm import RENDER_OT_warm_render, register_handlers as register_warm_session, unregister_handlers as unregister_warm_session
+from .STOOL_part.TextureIndex import register_handlers as register_texture_index, unregister_handlers as unregister_texture_index
 from .STOOL_part.TextureOps import TextureSearchProperties, INDEX_OT_build_texture_index, INDEX_OT_find_materials, INDEX_OT_select_objects_with_texture
+from .STOOL_part.TextureDedupe import INDEX_OT_deduplicate_images
+from .STOOL_part.TexturePurge import INDEX_OT_purge_unused
+from .STOOL_part.TextureRelink import INDEX_OT_relink_missing_images
+from .STOOL_part.TextureProxy import INDEX_OT_generate_texture_proxies, INDEX_OT_switch_texture_proxy
+from .STOOL_part.TextureAudit import TextureAuditItem, INDEX_OT_texture_audit, INDEX_OT_export_texture_audit, INDEX_UL_texture_audit
+from .STOOL_part.TextureSearch import TextureSearchResult, INDEX_OT_texture_search, INDEX_OT_texture_search_page, INDEX_OT_use_search_result, INDEX_UL_texture_search, PAGE_SIZE
 from bpy.props import PointerProperty  # type: ignore
 ### 面板类函数 ###
 
@@ -24,6 +35,12 @@ class VIEW3D_PT_SnapshotPanel(bpy.types.Panel):
         layout.operator("object.parent_to_empty_visn")
         layout.operator("object.parent_to_empty_visn_individual")
         layout.operator("object.select_parent_visn")
+        row = layout.row(align=True)
+        for mode, label in (('ANCESTORS', "所有父级"), ('ROOT', "根级"), ('DESCENDANTS', "所有子级")):
+            row.operator("object.select_hierarchy_visn", text=label).mode = mode
+        row = layout.row(align=True)
+        row.operator("object.select_hierarchy_visn", text="向上N级").mode = 'UP'
+        row.operator("object.select_hierarchy_visn", text="向下N级").mode = 'DOWN'
         layout.operator("object.release_all_children_to_subparent_visn")
         layout.operator("object.solo_pick_visn")
         layout.operator("object.solo_pick_delete_visn")
@@ -35,8 +52,21 @@ class VIEW3D_PT_SnapshotPanel(bpy.types.Panel):
         layout.operator("object.cspzt_camera_visn")
         layout.operator("object.add_light_with_constraint")
         layout.operator("wm.open_project_folder_visn")
-        layout.operator("object.save_selection_visn")
-        layout.operator("object.load_selection_visn")
+        # 选择组
+        box = layout.box()
+        selection_props = context.scene.selection_set_props
+        row = box.row(align=True)
+        row.operator("object.save_selection_visn")
+        row.operator("object.load_selection_visn")
+        if selection_props.sets:
+            row = box.row()
+            row.template_list("OBJECT_UL_selection_sets", "", selection_props, "sets",
+                              selection_props, "active_index", rows=3)
+            row.operator("object.selection_set_remove_visn", text="", icon='X')
+            row = box.row(align=True)
+            for operation, label in (('UNION', "并集"), ('INTERSECT', "交集"), ('DIFFERENCE', "差集")):
+                row.operator("object.selection_set_combine_visn", text=label).operation = operation
+        box.operator("object.selection_set_migrate_visn", icon='FILE_REFRESH')
         layout.operator("object.toggle_children_selectability_visn")
         layout.operator("object.delete_empty_null_visn")
 
@@ -44,6 +74,26 @@ class VIEW3D_PT_SnapshotPanel(bpy.types.Panel):
         layout.label(text="灯光类")
         # 建立索引按钮
         layout.operator("index.build_texture_index")
+        # 模糊搜索
+        box = layout.box()
+        row = box.row(align=True)
+        row.prop(props, "search_query", text="", icon='VIEWZOOM')
+        row.operator("index.texture_search", text="", icon='FILE_REFRESH')
+        box.row(align=True).prop(props, "search_kind", expand=True)
+        row = box.row(align=True)
+        row.prop(props, "filter_unused", toggle=True)
+        row.prop(props, "filter_missing", toggle=True)
+        row.prop(props, "filter_large", toggle=True)
+        row.prop(props, "filter_packed", toggle=True)
+        if props.search_results:
+            box.template_list("INDEX_UL_texture_search", "", props, "search_results",
+                              props, "search_index", rows=6)
+            page_count = (props.search_total + PAGE_SIZE - 1) // PAGE_SIZE
+            row = box.row(align=True)
+            row.operator("index.texture_search_page", text="", icon='TRIA_LEFT').delta = -1
+            row.label(text=f"{props.search_page + 1} / {page_count}（共 {props.search_total} 项）")
+            row.operator("index.texture_search_page", text="", icon='TRIA_RIGHT').delta = 1
+
         # 图片选择下拉菜单
         layout.label(text="选择要查找的贴图:")
         layout.prop_search(props, "texture_search_image",
@@ -54,6 +104,35 @@ class VIEW3D_PT_SnapshotPanel(bpy.types.Panel):
         layout.operator("index.select_objects_with_texture",
                         text="选中该贴图的材质对象", icon='OBJECT_DATA')
 
+        layout.operator("index.deduplicate_images", icon='DUPLICATE')
+        layout.operator("index.purge_unused", icon='TRASH')
+
+        # 丢失贴图重新链接
+        box = layout.box()
+        box.prop(props, "relink_roots")
+        box.operator("index.relink_missing_images", icon='FILE_REFRESH')
+
+        # 代理贴图
+        box = layout.box()
+        box.prop(props, "proxy_dir")
+        box.operator("index.generate_texture_proxies", icon='IMAGE_REFERENCE')
+        row = box.row(align=True)
+        for level, label in (('1', "原图"), ('2', "1/2"), ('4', "1/4"), ('8', "1/8")):
+            row.operator("index.switch_texture_proxy", text=label).level = level
+        box.prop(props, "proxy_prev_level")
+
+        # 贴图内存审计
+        box = layout.box()
+        row = box.row(align=True)
+        row.operator("index.texture_audit", icon='MEMORY')
+        row.operator("index.export_texture_audit", text="", icon='EXPORT')
+        if props.audit_items:
+            row = box.row(align=True)
+            row.prop(props, "audit_view", expand=True)
+            box.prop(props, "audit_sort")
+            box.template_list("INDEX_UL_texture_audit", "", props, "audit_items",
+                              props, "audit_index", rows=6)
+
         layout.separator()
         layout.label(text="动画类")
         layout.operator("object.add_noise_anim", text="Wiggle（添加/更新Noise）")
@@ -80,8 +159,23 @@ class VIEW3D_PT_SnapshotPanel(bpy.types.Panel):
         row = box.row(align=True)
         row.operator("render.apply_preset", text="prev").preset_type = 'prev'
         row.operator("render.apply_preset", text="demo").preset_type = 'demo'
+
+        # 保温渲染会话
+        box = layout.box()
+        row = box.row(align=True)
+        row.prop(props, "use_warm_session", text="保温会话", toggle=True)
+        row.prop(props, "warm_memory_limit", text="内存上限MB")
+        row = box.row(align=True)
+        row.operator("render.warm_render", text="渲染图像",
+                     icon='RENDER_STILL').animation = False
+        row.operator("render.warm_render", text="渲染动画",
+                     icon='RENDER_ANIMATION').animation = True
         layout.operator("render.open_output_folder",
                         text="打开输出文件夹", icon='FILE_FOLDER')
+        layout.operator("render.export_render_stats",
+                        text="导出渲染统计", icon='SPREADSHEET')
+        layout.operator("render.export_farm_jobs",
+                        text="导出渲染农场任务", icon='NETWORK_DRIVE')
 
 
 ### 注册类函数 ###
@@ -95,11 +189,19 @@ allClass = [
     SoloPick,
     SoloPick_delete,
     SelectParent,
+    SelectHierarchy,
     RAQtoSubparent,
     OpenProjectFolderOperator,
     AddLightWithConstraint,
+    SelectionSetItem,
+    SelectionSet,
+    SelectionSetProperties,
     SaveSelection,
     LoadSelection,
+    OBJECT_OT_selection_set_combine,
+    OBJECT_OT_selection_set_remove,
+    OBJECT_OT_selection_set_migrate,
+    OBJECT_UL_selection_sets,
     P2E,
     CAMERA_OT_create_focus_object,
     P2E_individual,
@@ -110,11 +212,28 @@ allClass = [
     RENDER_OT_create_presets,
     RENDER_OT_apply_preset,
     RENDER_OT_open_output_folder,
+    RENDER_OT_export_render_stats,
+    RENDER_OT_export_farm_jobs,
+    RENDER_OT_warm_render,
     # ----------
+    TextureAuditItem,
+    TextureSearchResult,
     TextureSearchProperties,
     INDEX_OT_build_texture_index,
     INDEX_OT_find_materials,
     INDEX_OT_select_objects_with_texture,
+    INDEX_OT_texture_audit,
+    INDEX_OT_export_texture_audit,
+    INDEX_UL_texture_audit,
+    INDEX_OT_texture_search,
+    INDEX_OT_texture_search_page,
+    INDEX_OT_use_search_result,
+    INDEX_UL_texture_search,
+    INDEX_OT_deduplicate_images,
+    INDEX_OT_purge_unused,
+    INDEX_OT_relink_missing_images,
+    INDEX_OT_generate_texture_proxies,
+    INDEX_OT_switch_texture_proxy,
 ]
 
 
@@ -125,13 +244,24 @@ def register():
         type=RenderPresetSettings)
     bpy.types.Scene.texture_search_props = PointerProperty(
         type=TextureSearchProperties)
+    bpy.types.Scene.selection_set_props = PointerProperty(
+        type=SelectionSetProperties)
+    register_render_stats()
+    register_warm_session()
+    register_texture_index()
+    register_selection_sets()
 
 
 def unregister():
+    unregister_selection_sets()
+    unregister_texture_index()
+    unregister_warm_session()
+    unregister_render_stats()
     for cls in allClass:
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.render_preset_settings
     del bpy.types.Scene.texture_search_props
+    del bpy.types.Scene.selection_set_props
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+import bpy  # type: ignore
+from mathutils import Matrix  # type: ignore
+
+# --------------------------
+# 父子级索引：一次遍历 bpy.data.objects 建立 父级 -> 子级列表，深度/根节点按需计算并缓存
+# 子级用有序dict保存（保持原顺序，删除为O(1)）
+# 每次操作符执行时建立一次，在该次执行中共享；改父级时用 move() 同步索引
+# reparent() 直接用矩阵计算批量改父级，代替逐个物体调用 bpy.ops
+# --------------------------
+
+
+class HierarchyIndex:
+    def __init__(self, objects=None):
+        self._children = {}
+        self._parent = {}
+        self._depth = {}
+        self._root = {}
+        for obj in bpy.data.objects if objects is None else objects:
+            parent = obj.parent
+            self._parent[obj] = parent
+            if parent is not None:
+                self._children.setdefault(parent, {})[obj] = None
+
+    def parent(self, obj):
+        return self._parent.get(obj, obj.parent)
+
+    def children(self, obj):
+        """直接子级（返回副本，调用方可以边遍历边改父级）"""
+        return list(self._children.get(obj, ()))
+
+    def ancestors(self, obj):
+        """父级链，从直接父级到根"""
+        chain = []
+        seen = set()
+        parent = self.parent(obj)
+        while parent is not None and parent not in seen:
+            seen.add(parent)
+            chain.append(parent)
+            parent = self.parent(parent)
+        return chain
+
+    def descendants(self, obj, max_depth=None):
+        """所有后代（广度优先，迭代实现，不受递归深度限制）；max_depth限制向下层数"""
+        result = []
+        level = [obj]
+        depth = 0
+        while level and (max_depth is None or depth < max_depth):
+            next_level = []
+            for item in level:
+                next_level.extend(self._children.get(item, ()))
+            result.extend(next_level)
+            level = next_level
+            depth += 1
+        return result
+
+    def _resolve(self, obj):
+        """沿父级链向上找到第一个已缓存的节点，再向下回填深度和根"""
+        chain = []
+        node = obj
+        while node is not None and node not in self._depth:
+            chain.append(node)
+            node = self.parent(node)
+        if node is None:
+            depth, root = -1, chain[-1]
+        else:
+            depth, root = self._depth[node], self._root[node]
+        for item in reversed(chain):
+            depth += 1
+            self._depth[item] = depth
+            self._root[item] = root
+
+    def depth(self, obj):
+        """顶层物体深度为0"""
+        if obj not in self._depth:
+            self._resolve(obj)
+        return self._depth[obj]
+
+    def root(self, obj):
+        if obj not in self._root:
+            self._resolve(obj)
+        return self._root[obj]
+
+    def roots(self, objects):
+        """去重后的根节点列表，共享的父级链只走一遍"""
+        seen = set()
+        result = []
+        for obj in objects:
+            root = self.root(obj)
+            if root not in seen:
+                seen.add(root)
+                result.append(root)
+        return result
+
+    def move(self, obj, new_parent):
+        """同步一次改父级操作（实际的父级由调用方设置）"""
+        old_parent = self._parent.get(obj)
+        if old_parent is not None:
+            self._children.get(old_parent, {}).pop(obj, None)
+        self._parent[obj] = new_parent
+        if new_parent is not None:
+            self._children.setdefault(new_parent, {})[obj] = None
+        # 深度和根可能整体变化，清空缓存重新计算
+        self._depth.clear()
+        self._root.clear()
+
+
+def reparent(moves, hierarchy=None):
+    """批量改父级并保持世界变换，等同于对每个物体执行
+    parent_clear(CLEAR_KEEP_TRANSFORM) / parent_no_inverse_set(keep_transform=True)：
+    父级逆矩阵设为单位矩阵，matrix_basis = 新父级世界矩阵的逆 @ 原世界矩阵。
+    moves 为 [(物体, 新父级或None)]，返回实际改动的物体数"""
+    moves = list(moves)
+    if not moves:
+        return 0
+    # 读取前统一刷新一次，保证新建/刚改动的物体世界矩阵有效
+    bpy.context.view_layer.update()
+
+    worlds = {}
+
+    def world(obj):
+        if obj not in worlds:
+            worlds[obj] = obj.matrix_world.copy()
+        return worlds[obj]
+
+    # 先缓存所有世界矩阵再写入：同一批里父级也在移动时，它的世界矩阵保持不变
+    for obj, new_parent in moves:
+        world(obj)
+        if new_parent is not None:
+            world(new_parent)
+
+    identity = Matrix.Identity(4)
+    moved = 0
+    for obj, new_parent in moves:
+        if new_parent is not None:
+            chain = hierarchy.ancestors(new_parent) if hierarchy else _live_ancestors(new_parent)
+            if new_parent == obj or obj in chain:
+                continue  # 会形成循环
+        obj.parent = new_parent
+        obj.parent_type = 'OBJECT'
+        obj.matrix_parent_inverse = identity
+        if new_parent is None:
+            obj.matrix_basis = worlds[obj]
+        else:
+            obj.matrix_basis = worlds[new_parent].inverted_safe() @ worlds[obj]
+        moved += 1
+    return moved
+
+
+def _live_ancestors(obj):
+    chain = []
+    parent = obj.parent
+    while parent is not None:
+        chain.append(parent)
+        parent = parent.parent
+    return chain
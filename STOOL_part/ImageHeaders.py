@@ -0,0 +1,179 @@
+import io
+import os
+import struct
+
+# --------------------------
+# 只读取图片文件头获取尺寸/通道/位深，不加载像素（可在线程中调用，不依赖bpy）
+# 返回 dict(width, height, channels, bit_depth, is_float)，无法识别时返回None
+# --------------------------
+
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+_TIFF_TYPES = {3: ('H', 2), 4: ('I', 4)}
+
+
+def _info(width, height, channels, bit_depth, is_float=False):
+    return {'width': width, 'height': height, 'channels': channels,
+            'bit_depth': bit_depth, 'is_float': is_float}
+
+
+def _read_png(f):
+    head = f.read(33)
+    if len(head) < 33 or head[12:16] != b'IHDR':
+        return None
+    width, height, depth, color_type = struct.unpack('>IIBB', head[16:26])
+    return _info(width, height, _PNG_CHANNELS.get(color_type, 4), depth)
+
+
+def _read_jpeg(f):
+    f.read(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        code = marker[1]
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        # SOF0-SOF15（排除DHT/JPG/DAC）
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            data = f.read(6)
+            if len(data) < 6:
+                return None
+            depth, height, width, channels = struct.unpack('>BHHB', data)
+            return _info(width, height, channels, depth)
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_tga(f):
+    head = f.read(18)
+    if len(head) < 18:
+        return None
+    width, height, pixel_depth = struct.unpack('<HHB', head[12:17])
+    channels = max(pixel_depth // 8, 1)
+    return _info(width, height, channels, 8)
+
+
+def _read_bmp(f):
+    head = f.read(30)
+    if len(head) < 30:
+        return None
+    width, height = struct.unpack('<ii', head[18:26])
+    pixel_depth = struct.unpack('<H', head[28:30])[0]
+    return _info(abs(width), abs(height), max(pixel_depth // 8, 1), 8)
+
+
+def _read_exr(f):
+    f.read(8)  # magic + version
+    width = height = None
+    channels = 0
+    is_half = True
+    while True:
+        name = _read_cstring(f)
+        if not name:
+            break
+        attr_type = _read_cstring(f)
+        size = struct.unpack('<i', f.read(4))[0]
+        data = f.read(size)
+        if name == 'dataWindow' and attr_type == 'box2i':
+            x_min, y_min, x_max, y_max = struct.unpack('<iiii', data[:16])
+            width, height = x_max - x_min + 1, y_max - y_min + 1
+        elif name == 'channels' and attr_type == 'chlist':
+            offset = 0
+            while offset < len(data) and data[offset] != 0:
+                end = data.index(b'\0', offset)
+                pixel_type = struct.unpack('<i', data[end + 1:end + 5])[0]
+                if pixel_type != 1:  # 0=UINT 1=HALF 2=FLOAT
+                    is_half = False
+                channels += 1
+                offset = end + 1 + 16
+    if width is None:
+        return None
+    return _info(width, height, channels or 4, 16 if is_half else 32, True)
+
+
+def _read_cstring(f, limit=256):
+    chars = bytearray()
+    while len(chars) < limit:
+        c = f.read(1)
+        if not c or c == b'\0':
+            break
+        chars += c
+    return chars.decode('latin-1')
+
+
+def _read_hdr(f):
+    for _ in range(64):
+        line = f.readline(512).strip()
+        parts = line.split()
+        if len(parts) == 4 and parts[0] in (b'-Y', b'+Y'):
+            return _info(int(parts[3]), int(parts[1]), 3, 32, True)
+    return None
+
+
+def _read_tiff(f):
+    order = '<' if f.read(2) == b'II' else '>'
+    magic, offset = struct.unpack(order + 'HI', f.read(6))
+    if magic != 42:
+        return None
+    f.seek(offset)
+    count = struct.unpack(order + 'H', f.read(2))[0]
+    tags = {}
+    for _ in range(count):
+        entry = f.read(12)
+        if len(entry) < 12:
+            break
+        tag, value_type, value_count = struct.unpack(order + 'HHI', entry[:8])
+        if value_type in _TIFF_TYPES:
+            fmt, size = _TIFF_TYPES[value_type]
+            tags[tag] = (struct.unpack(order + fmt, entry[8:8 + size])[0], value_count)
+    if 256 not in tags or 257 not in tags:
+        return None
+    bit_depth, _ = tags.get(258, (8, 1))
+    channels = tags.get(277, (1, 1))[0]
+    if tags.get(258, (8, 1))[1] > 2:
+        bit_depth = 8  # 多通道时值是偏移，按8位估算
+    sample_format = tags.get(339, (1, 1))[0]
+    return _info(tags[256][0], tags[257][0], channels, bit_depth,
+                 sample_format == 3 or bit_depth > 16)
+
+
+_SIGNATURES = [
+    (b'\x89PNG', _read_png),
+    (b'\xff\xd8', _read_jpeg),
+    (b'v/1\x01', _read_exr),
+    (b'#?', _read_hdr),
+    (b'II*\x00', _read_tiff),
+    (b'MM\x00*', _read_tiff),
+    (b'BM', _read_bmp),
+]
+
+
+def _read_stream(f, name):
+    magic = f.read(4)
+    f.seek(0)
+    for signature, reader in _SIGNATURES:
+        if magic.startswith(signature):
+            return reader(f)
+    if name.lower().endswith('.tga'):
+        return _read_tga(f)
+    return None
+
+
+def read_image_header(path):
+    """读取图片文件头；无法识别的格式返回None"""
+    try:
+        with open(path, 'rb') as f:
+            return _read_stream(f, path)
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def read_image_header_bytes(data, name=""):
+    """从内存数据（打包的图片）读取文件头"""
+    try:
+        return _read_stream(io.BytesIO(data), name)
+    except (struct.error, ValueError):
+        return None
@@ -1,22 +1,33 @@
 import bpy  # type: ignore
+from mathutils import Vector  # type: ignore
+from .Hierarchy import HierarchyIndex, reparent  # type: ignore
+from .Spatial import centroid, local_centroid  # type: ignore
 
 
 def centro(sel):
-    x = sum(obj.location[0] for obj in sel) / len(sel)
-    y = sum(obj.location[1] for obj in sel) / len(sel)
-    z = sum(obj.location[2] for obj in sel) / len(sel)
-    return (x, y, z)
+    return local_centroid(sel)
 
 
-def centro_global(sel):
-    x = sum(obj.matrix_world.translation[0] for obj in sel) / len(sel)
-    y = sum(obj.matrix_world.translation[1] for obj in sel) / len(sel)
-    z = sum(obj.matrix_world.translation[2] for obj in sel) / len(sel)
-    return (x, y, z)
+def centro_global(sel, use_bounds=False):
+    return centroid(sel, use_bounds)
 
 
-def get_children(my_object):
-    return [ob for ob in bpy.data.objects if ob.parent == my_object]
+def get_children(my_object, hierarchy=None):
+    """传入本次操作的父子级索引时直接查表，否则建立临时索引"""
+    if hierarchy is None:
+        hierarchy = HierarchyIndex()
+    return hierarchy.children(my_object)
+
+
+def release_children(objs, hierarchy):
+    """每个物体的子级交给它的父级（没有父级时放到世界层级），返回 {子级: 新父级}"""
+    moves = {}
+    for obj in objs:
+        new_parent = hierarchy.parent(obj)
+        for child in get_children(obj, hierarchy):
+            hierarchy.move(child, new_parent)
+            moves[child] = new_parent
+    return moves
 
 
 class CAMERA_OT_create_focus_object(bpy.types.Operator):
@@ -64,27 +75,13 @@ class SoloPick(bpy.types.Operator):
         except:
             pass
 
+        # 子级交给上一层父级，所选物体放到世界层级，一次性计算矩阵
+        hierarchy = HierarchyIndex()
+        moves = release_children(objs, hierarchy)
         for obj in objs:
-            obj.select_set(False)
-        for obj in objs:
-            if not obj.parent:
-                for children in get_children(obj):
-                    children.select_set(True)
-                    bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-                    children.select_set(False)
-            else:
-                for children in get_children(obj):
-                    children.select_set(True)
-                    bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-                    bpy.context.view_layer.objects.active = obj.parent
-                    bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-                    children.select_set(False)
-        for obj in objs:
-            obj.select_set(True)
-            bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-            obj.select_set(False)
-        for obj in objs:
-            obj.select_set(True)
+            hierarchy.move(obj, None)
+            moves[obj] = None
+        reparent(moves.items(), hierarchy)
         return {'FINISHED'}
 
 
@@ -108,6 +105,99 @@ class SelectParent(bpy.types.Operator):
         return {'FINISHED'}
 
 
+HIERARCHY_SELECT_MODES = [
+    ('ANCESTORS', "所有父级", "选择完整的父级链"),
+    ('ROOT', "根级", "选择最顶层的父级"),
+    ('DESCENDANTS', "所有子级", "选择全部后代"),
+    ('UP', "向上N级", "选择向上N级以内的父级"),
+    ('DOWN', "向下N级", "选择向下N级以内的子级"),
+]
+
+
+def collect_up(objs, hierarchy, levels=None):
+    """父级链（levels为None时到根）；共享的父级链只走一遍"""
+    remaining = {}
+    for obj in objs:
+        budget = levels
+        parent = hierarchy.parent(obj)
+        while parent is not None and (budget is None or budget > 0):
+            budget = None if budget is None else budget - 1
+            # 已经以更大的剩余层数到达过该父级，后面的链都已走过
+            if parent in remaining and (remaining[parent] is None or
+                                        (budget is not None and remaining[parent] >= budget)):
+                break
+            remaining[parent] = budget
+            parent = hierarchy.parent(parent)
+    return list(remaining)
+
+
+def collect_down(objs, hierarchy, levels=None):
+    """后代（levels为None时不限层数）；已展开过的子树不重复遍历"""
+    remaining = {}
+    stack = [(obj, levels) for obj in objs]
+    while stack:
+        obj, budget = stack.pop()
+        if budget is not None and budget <= 0:
+            continue
+        child_budget = None if budget is None else budget - 1
+        for child in hierarchy.children(obj):
+            known = remaining.get(child, -1)
+            if known is None or (child_budget is not None and known >= child_budget):
+                continue
+            remaining[child] = child_budget
+            stack.append((child, child_budget))
+    return list(remaining)
+
+
+class SelectHierarchy(bpy.types.Operator):
+    bl_idname = "object.select_hierarchy_visn"
+    bl_label = "层级选择"
+    bl_description = "按父子级选择：所有父级、根级、所有子级、向上/向下N级"
+    bl_options = {"REGISTER", "UNDO"}
+
+    mode: bpy.props.EnumProperty(items=HIERARCHY_SELECT_MODES, default='ANCESTORS')  # type: ignore
+    levels: bpy.props.IntProperty(  # type: ignore
+        name="层数",
+        description="向上/向下N级时的层数",
+        default=1,
+        min=1
+    )
+    extend: bpy.props.BoolProperty(  # type: ignore
+        name="保留当前选择",
+        default=False
+    )
+
+    def execute(self, context):
+        objs = context.selected_objects
+        if not objs:
+            self.report({'WARNING'}, "没有选择任何对象")
+            return {'CANCELLED'}
+        try:
+            bpy.ops.object.mode_set()
+        except:
+            pass
+
+        hierarchy = HierarchyIndex()
+        if self.mode == 'ROOT':
+            targets = hierarchy.roots(objs)
+        elif self.mode in ('ANCESTORS', 'UP'):
+            targets = collect_up(objs, hierarchy, self.levels if self.mode == 'UP' else None)
+        else:
+            targets = collect_down(objs, hierarchy, self.levels if self.mode == 'DOWN' else None)
+
+        if not self.extend:
+            for obj in objs:
+                obj.select_set(False)
+        visible = set(context.view_layer.objects)
+        count = 0
+        for obj in targets:
+            if obj in visible:
+                obj.select_set(True)
+                count += 1
+        self.report({'INFO'}, f"已选中 {count} 个对象")
+        return {'FINISHED'}
+
+
 class SoloPick_delete(bpy.types.Operator):
     bl_idname = "object.solo_pick_delete_visn"
     bl_label = "拎出并删除"
@@ -121,27 +211,13 @@ class SoloPick_delete(bpy.types.Operator):
         except:
             pass
 
+        # 子级交给上一层父级，所选物体放到世界层级，一次性计算矩阵
+        hierarchy = HierarchyIndex()
+        moves = release_children(objs, hierarchy)
         for obj in objs:
-            obj.select_set(False)
-        for obj in objs:
-            if not obj.parent:
-                for children in get_children(obj):
-                    children.select_set(True)
-                    bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-                    children.select_set(False)
-            else:
-                for children in get_children(obj):
-                    children.select_set(True)
-                    bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-                    bpy.context.view_layer.objects.active = obj.parent
-                    bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-                    children.select_set(False)
-        for obj in objs:
-            obj.select_set(True)
-            bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-            obj.select_set(False)
-        for obj in objs:
-            obj.select_set(True)
+            hierarchy.move(obj, None)
+            moves[obj] = None
+        reparent(moves.items(), hierarchy)
         bpy.ops.object.delete(use_global=False)
         return {'FINISHED'}
 
@@ -158,23 +234,11 @@ class RAQtoSubparent(bpy.types.Operator):
             bpy.ops.object.mode_set()
         except:
             pass
-        NOParent = False
+        hierarchy = HierarchyIndex()
         for obj in objs:
             obj.select_set(False)
-        for obj in objs:
-            if not obj.parent:
-                NOParent = True
-                for children in get_children(obj):
-                    children.select_set(True)
-                    bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-                    children.select_set(False)
-            else:
-                for children in get_children(obj):
-                    children.select_set(True)
-                    bpy.ops.object.parent_clear(type='CLEAR_KEEP_TRANSFORM')
-                    bpy.context.view_layer.objects.active = obj.parent
-                    bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-                    children.select_set(False)
+        reparent(release_children(objs, hierarchy).items(), hierarchy)
+        NOParent = any(obj.parent is None for obj in objs)
         if not NOParent:
             for obj in objs:
                 bpy.context.view_layer.objects.active = obj.parent
@@ -197,36 +261,24 @@ class P2E_individual(bpy.types.Operator):
         except:
             pass
 
-        # 为每个选中的物体创建一个独立的父级空物体
+        # 为每个选中的物体创建一个独立的父级空物体（直接用bpy.data创建，不走bpy.ops）
+        moves = []
         for obj in objs:
-            # 计算当前物体的位置
-            loc = obj.location.copy()
-
-            # 创建空物体
-            bpy.ops.object.add(type='EMPTY', location=loc,
-                               rotation=obj.rotation_euler)
-            new_empty = context.object  # 获取新创建的空物体
-
-            # 获取当前物体的集合
-            obj_collections = obj.users_collection
+            new_empty = bpy.data.objects.new("Empty", None)
+            # 空物体与当前物体处在同一父级空间，位置/旋转与它一致
+            new_empty.location = obj.location
+            new_empty.rotation_euler = obj.rotation_euler
+            new_empty.parent = obj.parent  # 继承原始物体的父级
 
             # 将新创建的空物体添加到当前物体的集合中
-            try:
-                for collection in obj_collections:
-                    collection.objects.link(new_empty)
-                # 从当前活跃集合中移除新创建的空物体
-                context.collection.objects.unlink(new_empty)
-            except:
-                pass
+            for collection in obj.users_collection or (context.collection,):
+                collection.objects.link(new_empty)
 
-            # 设置父级关系
-            new_empty.parent = obj.parent  # 继承原始物体的父级
+            # 当前物体稍后统一设为新空物体的子物体
+            moves.append((obj, new_empty))
 
-            # 设置当前物体为新空物体的子物体
-            obj.select_set(True)
-            context.view_layer.objects.active = new_empty
-            bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-            obj.select_set(False)
+        # reparent内部只刷新一次视图层
+        reparent(moves)
 
         # 恢复原始选择状态
         for obj in objs:
@@ -243,6 +295,12 @@ class P2E(bpy.types.Operator):
     bl_description = "所有所选物体到父级"
     bl_options = {"REGISTER", "UNDO"}
 
+    use_bounds: bpy.props.BoolProperty(  # type: ignore
+        name="按几何包围盒",
+        description="父级放在所选物体几何包围盒的中心，而不是原点的平均位置",
+        default=False
+    )
+
     def execute(self, context):
         objs = context.selected_objects
         last_active_obj = context.view_layer.objects.active  # 获取最后一次选中的活跃对象
@@ -252,8 +310,14 @@ class P2E(bpy.types.Operator):
         except:
             pass
 
-        loc = centro(objs)
         same_parent = all(o.parent == objs[0].parent for o in objs)
+        if self.use_bounds:
+            loc = Vector(centroid(objs, use_bounds=True))
+            # 空物体稍后会设为共同父级的子级，位置需要换算到父级空间
+            if same_parent and objs[0].parent:
+                loc = objs[0].parent.matrix_world.inverted_safe() @ loc
+        else:
+            loc = centro(objs)
 
         if len(objs) == 1:
             bpy.ops.object.add(type='EMPTY', location=loc,
@@ -286,9 +350,6 @@ class P2E(bpy.types.Operator):
         if same_parent:
             new_empty.parent = objs[0].parent
 
-        for o in objs:
-            o.select_set(True)
-            bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-            o.select_set(False)
+        reparent([(o, new_empty) for o in objs])
 
         return {'FINISHED'}
@@ -0,0 +1,136 @@
+import re
+import math
+import time
+import hashlib
+import bpy  # type: ignore
+from .RenderStats import set_recording  # type: ignore
+
+# --------------------------
+# 时间预算：探测渲染测出 秒/采样，再按每帧预算反推采样数
+# --------------------------
+
+# 场景哈希 -> (固定开销秒数, 每采样秒数)
+calibration_cache = {}
+
+PROBE_SAMPLES = (4, 16)
+
+# 记录场景当前是否由预算控制（切回普通预设时需要撤销time_limit）
+BUDGET_PROP = "stool_time_budget"
+# 应用预算前用户自己的自适应采样设置 [use_adaptive_sampling, adaptive_threshold]，清除预算时还原
+ADAPTIVE_PROP = "stool_budget_adaptive"
+
+_BUDGET_RE = re.compile(r"^\s*([\d.]+)\s*(s|sec|m|min)?", re.IGNORECASE)
+
+
+def parse_budget(value):
+    """解析预算参数，例如 45s/frame、1.5m，返回每帧秒数；无法解析返回None"""
+    match = _BUDGET_RE.match(value or "")
+    if not match:
+        return None
+    try:
+        seconds = float(match.group(1))
+    except ValueError:
+        return None
+    unit = (match.group(2) or 's').lower()
+    if unit.startswith('m'):
+        seconds *= 60.0
+    return seconds if seconds > 0 else None
+
+
+def scene_hash(scene):
+    """影响渲染耗时的场景状态摘要，作为校准缓存的键"""
+    render = scene.render
+    parts = [
+        bpy.data.filepath, scene.name, render.engine,
+        render.resolution_x, render.resolution_y, render.resolution_percentage,
+        len(bpy.data.objects), len(bpy.data.meshes),
+        len(bpy.data.materials), len(bpy.data.images),
+    ]
+    if render.engine == 'CYCLES' and hasattr(scene, 'cycles'):
+        parts += [scene.cycles.device, scene.cycles.use_denoising,
+                  scene.cycles.max_bounces]
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _set_samples(scene, samples):
+    if scene.render.engine == 'CYCLES' and hasattr(scene, 'cycles'):
+        scene.cycles.samples = samples
+    elif hasattr(scene, 'eevee'):
+        scene.eevee.taa_render_samples = samples
+
+
+def _probe_render(scene, samples):
+    _set_samples(scene, samples)
+    start = time.perf_counter()
+    bpy.ops.render.render(write_still=False, scene=scene.name)
+    return time.perf_counter() - start
+
+
+def calibrate(scene):
+    """在当前帧用两档低采样各渲染一次，线性拟合出 (开销, 秒/采样)，结果按场景哈希缓存"""
+    key = scene_hash(scene)
+    if key in calibration_cache:
+        return calibration_cache[key]
+
+    cycles = scene.cycles if scene.render.engine == 'CYCLES' and hasattr(
+        scene, 'cycles') else None
+    saved_samples = cycles.samples if cycles else scene.eevee.taa_render_samples
+    saved_cycles = None
+    if cycles:
+        saved_cycles = (cycles.use_adaptive_sampling, cycles.time_limit)
+        # 探测时关闭自适应和时间限制，保证采样数准确
+        cycles.use_adaptive_sampling = False
+        cycles.time_limit = 0.0
+
+    set_recording(False)
+    try:
+        low, high = PROBE_SAMPLES
+        t_low = _probe_render(scene, low)
+        t_high = _probe_render(scene, high)
+    finally:
+        set_recording(True)
+        _set_samples(scene, saved_samples)
+        if saved_cycles:
+            cycles.use_adaptive_sampling, cycles.time_limit = saved_cycles
+
+    per_sample = max((t_high - t_low) / (high - low), 1e-6)
+    overhead = max(t_low - low * per_sample, 0.0)
+    calibration_cache[key] = (overhead, per_sample)
+    return calibration_cache[key]
+
+
+def apply_time_budget(scene, budget, max_samples=None):
+    """按每帧预算设置采样数；Cycles同时设置time_limit和adaptive_threshold。返回最终采样数"""
+    overhead, per_sample = calibrate(scene)
+    sampling_time = max(budget - overhead, per_sample)
+    samples = max(1, int(sampling_time / per_sample))
+    if max_samples:
+        samples = min(samples, max_samples)
+
+    _set_samples(scene, samples)
+    scene[BUDGET_PROP] = budget
+    if scene.render.engine == 'CYCLES' and hasattr(scene, 'cycles'):
+        cycles = scene.cycles
+        # 连续应用多个预算预设时只保存第一次之前的设置
+        if ADAPTIVE_PROP not in scene:
+            scene[ADAPTIVE_PROP] = [int(cycles.use_adaptive_sampling), cycles.adaptive_threshold]
+        cycles.time_limit = sampling_time
+        # 采样越少，噪点阈值放得越宽，让自适应采样更早收敛
+        cycles.use_adaptive_sampling = True
+        cycles.adaptive_threshold = min(
+            max(0.01 * math.sqrt(1024.0 / samples), 0.005), 0.2)
+    return samples
+
+
+def clear_time_budget(scene):
+    """撤销预算预设设置的time_limit和自适应采样阈值，普通预设不受影响"""
+    if BUDGET_PROP not in scene:
+        return
+    del scene[BUDGET_PROP]
+    saved = scene.pop(ADAPTIVE_PROP, None)
+    if hasattr(scene, 'cycles'):
+        cycles = scene.cycles
+        cycles.time_limit = 0.0
+        if saved is not None:
+            cycles.use_adaptive_sampling = bool(saved[0])
+            cycles.adaptive_threshold = saved[1]
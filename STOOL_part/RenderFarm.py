@@ -0,0 +1,185 @@
+import os
+import json
+import math
+import shutil
+import bpy  # type: ignore
+from bpy.props import FloatProperty  # type: ignore
+from bpy.types import Operator  # type: ignore
+from .RenderOps import collect_presets, update_current_settings_display  # type: ignore
+from .RenderStats import stats_log_path, read_stats_log, get_render_samples  # type: ignore
+from .RenderBudget import BUDGET_PROP, ADAPTIVE_PROP, parse_budget  # type: ignore
+
+# --------------------------
+# 渲染农场：把摄像机上的预设导出成独立的任务json + 命令行执行脚本
+# --------------------------
+
+JOB_DIR_NAME = "__FarmJobs__"
+RUNNER_NAME = "farm_runner.py"
+
+# 没有统计数据时的粗略估算：每秒可完成的 像素×采样 数
+FALLBACK_SAMPLE_PIXELS_PER_SECOND = 2.0e8
+
+
+def _snapshot(scene):
+    """保存会被预设改写的场景设置"""
+    render = scene.render
+    state = {
+        'resolution': (render.resolution_x, render.resolution_y, render.resolution_percentage),
+        'frames': (scene.frame_start, scene.frame_end, scene.frame_step),
+        'filepath': render.filepath,
+        'budget': scene.get(BUDGET_PROP),
+        'adaptive': scene.get(ADAPTIVE_PROP),
+    }
+    if hasattr(scene, 'cycles'):
+        cycles = scene.cycles
+        state['cycles'] = (cycles.samples, cycles.time_limit,
+                           cycles.use_adaptive_sampling, cycles.adaptive_threshold)
+    if hasattr(scene, 'eevee'):
+        state['eevee'] = scene.eevee.taa_render_samples
+    return state
+
+
+def _restore(scene, state):
+    render = scene.render
+    render.resolution_x, render.resolution_y, render.resolution_percentage = state['resolution']
+    scene.frame_start, scene.frame_end, scene.frame_step = state['frames']
+    render.filepath = state['filepath']
+    for prop, value in ((BUDGET_PROP, state['budget']), (ADAPTIVE_PROP, state['adaptive'])):
+        if value is None:
+            scene.pop(prop, None)
+        else:
+            scene[prop] = value
+    if 'cycles' in state:
+        cycles = scene.cycles
+        (cycles.samples, cycles.time_limit,
+         cycles.use_adaptive_sampling, cycles.adaptive_threshold) = state['cycles']
+    if 'eevee' in state:
+        scene.eevee.taa_render_samples = state['eevee']
+
+
+def estimate_frame_cost(scene, preset_name, params):
+    """估算单帧耗时（秒）：优先使用渲染统计，其次时间预算，最后按像素×采样粗估"""
+    records = [r for r in read_stats_log(stats_log_path(scene))
+               if str(r.get('preset', '')).lower() == preset_name and r.get('wall_time')]
+    if records:
+        return sum(r['wall_time'] for r in records) / len(records)
+
+    budget = parse_budget(params.get('budget'))
+    if budget:
+        return budget
+
+    render = scene.render
+    pixels = (render.resolution_x * render.resolution_percentage / 100.0) * \
+        (render.resolution_y * render.resolution_percentage / 100.0)
+    return max(pixels * max(get_render_samples(scene), 1) / FALLBACK_SAMPLE_PIXELS_PER_SECOND, 1.0)
+
+
+def split_chunks(frame_start, frame_end, frame_step, frames_per_chunk):
+    """按步长把帧范围切成尽量均匀的分块，返回 [[首帧, 末帧], ...]"""
+    frames = list(range(frame_start, frame_end + 1, frame_step))
+    if not frames:
+        return []
+    count = math.ceil(len(frames) / max(frames_per_chunk, 1))
+    size, extra = divmod(len(frames), count)
+    chunks = []
+    index = 0
+    for i in range(count):
+        length = size + (1 if i < extra else 0)
+        chunks.append([frames[index], frames[index + length - 1]])
+        index += length
+    return chunks
+
+
+class RENDER_OT_export_farm_jobs(Operator):
+    """将活跃摄像机的所有预设导出为渲染农场任务"""
+    bl_idname = "render.export_farm_jobs"
+    bl_label = "导出渲染农场任务"
+    bl_description = "把活跃摄像机的预设导出为任务json和命令行执行脚本，按估算的单帧耗时分块"
+    bl_options = {'REGISTER'}
+
+    chunk_minutes: FloatProperty(  # type: ignore
+        name="每块目标时长(分钟)",
+        description="按估算的单帧耗时把帧范围切块，使每块耗时接近该值",
+        default=15.0, min=0.5
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+    def execute(self, context):
+        scene = context.scene
+        cam = scene.camera
+        if not cam:
+            self.report({'ERROR'}, "不存在活跃摄像机")
+            return {'CANCELLED'}
+        if not bpy.data.filepath:
+            self.report({'ERROR'}, "请先保存工程文件")
+            return {'CANCELLED'}
+        if bpy.data.is_dirty:
+            self.report({'WARNING'}, "工程有未保存的修改，农场渲染使用的是磁盘上的文件")
+
+        presets, hd_params, _ = collect_presets(cam)
+        if not hd_params:
+            self.report({'ERROR'}, "摄像机上没有预设，请先创建预设")
+            return {'CANCELLED'}
+        all_presets = {'hd': hd_params}
+        all_presets.update({k: v for k, v in presets.items() if k != 'current'})
+
+        job_dir = os.path.join(os.path.dirname(bpy.data.filepath), JOB_DIR_NAME)
+        os.makedirs(job_dir, exist_ok=True)
+        blend_stem = os.path.splitext(os.path.basename(bpy.data.filepath))[0]
+
+        # 逐个写入预设字段读出最终设置，结束后还原；
+        # settings_only 不切换代理贴图、不做预算探测渲染，预算直接作为农场的time_limit
+        current_name = next((c.name for c in cam.children if c.name.startswith("Current:")), None)
+        state = _snapshot(scene)
+        jobs = []
+        try:
+            for preset_name, params in all_presets.items():
+                bpy.ops.render.apply_preset(preset_type=preset_name, settings_only=True)
+                render = scene.render
+                frame_cost = estimate_frame_cost(scene, preset_name, params)
+                per_chunk = max(1, int(self.chunk_minutes * 60.0 / frame_cost))
+                job = {
+                    'version': 1,
+                    'blend': bpy.data.filepath,
+                    'scene': scene.name,
+                    'camera': cam.name,
+                    'preset': preset_name,
+                    'preset_fields': params,
+                    'engine': render.engine,
+                    'settings': {
+                        'resolution_x': render.resolution_x,
+                        'resolution_y': render.resolution_y,
+                        'resolution_percentage': render.resolution_percentage,
+                        'samples': get_render_samples(scene),
+                        'time_limit': parse_budget(params.get('budget')) or (
+                            scene.cycles.time_limit if hasattr(scene, 'cycles') else 0.0),
+                        'frame_start': scene.frame_start,
+                        'frame_end': scene.frame_end,
+                        'frame_step': scene.frame_step,
+                    },
+                    'output': bpy.path.abspath(render.filepath),
+                    'frame_cost': round(frame_cost, 2),
+                    'chunks': split_chunks(scene.frame_start, scene.frame_end,
+                                           scene.frame_step, per_chunk),
+                }
+                jobs.append(job)
+        finally:
+            _restore(scene, state)
+            update_current_settings_display(cam, scene)
+            if current_name:
+                for child in cam.children:
+                    if child.name.startswith("Current:"):
+                        child.name = current_name
+                        break
+
+        for job in jobs:
+            path = os.path.join(job_dir, f"{blend_stem}_{scene.name}_{job['preset']}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False, indent=2)
+        shutil.copyfile(os.path.join(os.path.dirname(__file__), RUNNER_NAME),
+                        os.path.join(job_dir, RUNNER_NAME))
+
+        self.report({'INFO'}, f"已导出 {len(jobs)} 个任务到 {job_dir}")
+        return {'FINISHED'}
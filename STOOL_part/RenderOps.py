@@ -6,6 +6,9 @@ import re
 import bpy  # type: ignore
 import platform
 import subprocess
+from .RenderBudget import parse_budget, apply_time_budget, clear_time_budget  # type: ignore
+from .RenderWarm import update_warm_session  # type: ignore
+from .TextureProxy import apply_proxy_for_preset  # type: ignore
 # --------------------------
 # 工具函数
 # --------------------------
@@ -32,6 +35,17 @@ class RenderPresetSettings(PropertyGroup):
         description="Toggle between absolute and relative paths",
         default=False
     )
+    use_warm_session: BoolProperty(  # type: ignore
+        name="Warm Render Session",
+        description="Keep persistent data (Cycles) / pre-compile shaders (EEVEE) between preset renders",
+        default=False,
+        update=update_warm_session
+    )
+    warm_memory_limit: IntProperty(  # type: ignore
+        name="Warm Session Memory Limit (MB)",
+        description="End the warm session once render peak memory exceeds this value",
+        default=16384, min=256
+    )
 
 
 class RENDER_OT_open_output_folder(Operator):
@@ -93,24 +107,14 @@ class RENDER_OT_create_presets(Operator):
             self.report({'ERROR'}, "不存在活跃摄像机")
             return {'CANCELLED'}
 
-        # 获取摄像机所在的集合
-        cam_coll = None
-        for collection in bpy.data.collections:
-            if cam.name in collection.objects:
-                cam_coll = collection
-                break
-
-        if not cam_coll:
-            cam_coll = context.scene.collection  # 如果摄像机不在任何集合中，使用主场景集合
-
-        # 删除旧的预设对象
-        for child in cam.children:
-            if re.match(r'^\d+\..+', child.name) or child.name == "Current":
-                # 从所有集合中移除对象
-                for coll in bpy.data.collections:
-                    if child.name in coll.objects:
-                        coll.objects.unlink(child)
-                bpy.data.objects.remove(child, do_unlink=True)
+        # 获取摄像机所在的集合（不在任何集合中时使用主场景集合）
+        cam_coll = get_camera_collection(cam, context.scene)
+
+        # 删除旧的预设对象（batch_remove会同时从所有集合中移除）
+        stale = [child for child in cam.children
+                 if re.match(r'^\d+\..+', child.name) or child.name.startswith("Current")]
+        if stale:
+            bpy.data.batch_remove(stale)
 
         # 获取当前设置
         props = context.scene.render_preset_settings
@@ -219,6 +223,12 @@ class RENDER_OT_apply_preset(Operator):
         default="Style"
     )
 
+    # 只写入预设字段（农场导出用）：不切换代理贴图，时间预算不做探测渲染
+    settings_only: BoolProperty(  # type: ignore
+        default=False,
+        options={'HIDDEN', 'SKIP_SAVE'}
+    )
+
     # all_scenes: BoolProperty(
     #     name="All Scenes",
     #     description="Apply to all scenes",
@@ -236,22 +246,7 @@ class RENDER_OT_apply_preset(Operator):
             return {'CANCELLED'}
 
         # 获取所有预设
-        presets = {}
-        hd_params = {}
-        folder_params = {}
-
-        for child in cam.children:
-            if ':' in child.name:
-                preset_name = re.sub(
-                    r'^\d+\.\s*', '', child.name.split(':', 1)[0].strip().lower())
-                params = self.parse_preset_params(child.name.split(':', 1)[1])
-
-                if preset_name == 'folder':
-                    folder_params = params
-                elif preset_name == 'hd':
-                    hd_params = params
-                else:
-                    presets[preset_name] = params
+        presets, hd_params, folder_params = collect_presets(cam)
 
         if self.preset_type.lower() not in presets and self.preset_type.lower() != 'hd':
             self.report({'ERROR'}, f"找不到 {self.preset_type} 预设")
@@ -276,6 +271,10 @@ class RENDER_OT_apply_preset(Operator):
             self.apply_preset_settings(
                 render, context.scene, cycles, eevee, presets[self.preset_type.lower()], hd_params)
 
+        # prev预设可切换到代理贴图
+        if not self.settings_only:
+            apply_proxy_for_preset(context.scene, self.preset_type.lower())
+
         # Update display
         update_current_settings_display(
             cam, context.scene, self.preset_type.lower())
@@ -306,6 +305,7 @@ class RENDER_OT_apply_preset(Operator):
 
     def apply_hd_settings(self, render, scene, cycles, eevee, params):
         """应用HD预设设置"""
+        clear_time_budget(scene)
         if 'xy' in params:
             size = params['xy'].lower()
             if 'x' in size:
@@ -386,6 +386,18 @@ class RENDER_OT_apply_preset(Operator):
             except ValueError:
                 pass
 
+        # 时间预算设置（例如 budget=45s/frame），覆盖sp
+        budget = parse_budget(params.get('budget'))
+        if budget and not self.settings_only:
+            try:
+                max_samples = int(hd_params.get('sp', 0)) or None
+            except ValueError:
+                max_samples = None
+            samples = apply_time_budget(scene, budget, max_samples)
+            self.report({'INFO'}, f"时间预算 {budget:g}s/帧 -> 采样 {samples}")
+        else:
+            clear_time_budget(scene)
+
         # 帧范围设置
         if 'rng' in params:
             range_val = params['rng']
@@ -425,45 +437,67 @@ class RENDER_OT_apply_preset(Operator):
 
     def parse_preset_params(self, param_str):
         """解析预设参数"""
-        params = {}
-        bracket_content = param_str.split(']')[0].split('[')[-1].strip()
-
-        if '"' in bracket_content:  # Path format
-            paths = [p.strip().strip('"') for p in bracket_content.split(',')]
-            if len(paths) >= 2:
-                params["relative"] = paths[0]
-                params["absolute"] = paths[1]
-                return params
-
-        # 普通参数解析
-        for param in bracket_content.split(','):
-            param = param.strip()
-            if '=' in param:
-                key, value = param.split('=', 1)
-                params[key.strip().lower()] = value.strip().strip('"')
-
-        return params
-
-
-def get_camera_collection(camera_obj):
-    """获取摄像机所在的第一个集合"""
-    for coll in bpy.data.collections:
-        if camera_obj.name in coll.objects:
+        return parse_preset_params(param_str)
+
+
+def parse_preset_params(param_str):
+    """解析预设参数"""
+    params = {}
+    bracket_content = param_str.split(']')[0].split('[')[-1].strip()
+
+    if '"' in bracket_content:  # Path format
+        paths = [p.strip().strip('"') for p in bracket_content.split(',')]
+        if len(paths) >= 2:
+            params["relative"] = paths[0]
+            params["absolute"] = paths[1]
+            return params
+
+    # 普通参数解析
+    for param in bracket_content.split(','):
+        param = param.strip()
+        if '=' in param:
+            key, value = param.split('=', 1)
+            params[key.strip().lower()] = value.strip().strip('"')
+
+    return params
+
+
+def collect_presets(cam):
+    """读取摄像机子级上的所有预设，返回 (其他预设, HD参数, 文件夹参数)"""
+    presets = {}
+    hd_params = {}
+    folder_params = {}
+
+    for child in cam.children:
+        if ':' in child.name:
+            preset_name = re.sub(
+                r'^\d+\.\s*', '', child.name.split(':', 1)[0].strip().lower())
+            params = parse_preset_params(child.name.split(':', 1)[1])
+
+            if preset_name == 'folder':
+                folder_params = params
+            elif preset_name == 'hd':
+                hd_params = params
+            else:
+                presets[preset_name] = params
+
+    return presets, hd_params, folder_params
+
+
+def get_camera_collection(camera_obj, scene=None):
+    """获取摄像机所在的第一个集合，找不到时返回scene的主集合（scene为None时返回None）"""
+    # users_collection直接给出包含该对象的集合，无需扫描bpy.data.collections；
+    # 场景主集合可能排在前面，与原先只扫描bpy.data.collections一致，优先返回普通集合
+    for coll in camera_obj.users_collection:
+        if not coll.is_embedded_data:
             return coll
-    return None
+    return scene.collection if scene else None
 
 
 def update_current_settings_display(cam, scene, preset_name="HD"):
     """更新当前设置显示对象"""
     # 获取摄像机所在的集合
-    cam_coll = None
-    for collection in bpy.data.collections:
-        if cam.name in collection.objects:
-            cam_coll = collection
-            break
-
-    if not cam_coll:
-        cam_coll = scene.collection
+    cam_coll = get_camera_collection(cam, scene)
 
     render = scene.render
     cycles = scene.cycles if hasattr(scene, 'cycles') else None
@@ -496,11 +530,7 @@ def update_current_settings_display(cam, scene, preset_name="HD"):
     elif sum(1 for child in cam.children if child.name.startswith("Current")) > 1:
         to_delete = [
             child for child in cam.children if child.name.startswith("Current")][1:]
-        for obj in to_delete:
-            for coll in bpy.data.collections:
-                if obj.name in coll.objects:
-                    coll.objects.unlink(obj)
-            bpy.data.objects.remove(obj, do_unlink=True)
+        bpy.data.batch_remove(to_delete)
 
     # 更新对象名称显示当前设置
     current_obj.name = f"Current: {preset_name} [xy={render.resolution_x}x{render.resolution_y}@{render.resolution_percentage}%, sp={current_samples}, Rng={scene.frame_start}-{scene.frame_end}@{scene.frame_step}, {path_type}]"
@@ -0,0 +1,219 @@
+import os
+import re
+import csv
+import json
+import time
+import bpy  # type: ignore
+from bpy.app.handlers import persistent  # type: ignore
+from bpy.types import Operator  # type: ignore
+
+# --------------------------
+# 渲染统计：挂接render handlers，记录每帧耗时/内存，写入预设输出目录下的jsonl
+# --------------------------
+
+STATS_LOG_NAME = "render_stats.jsonl"
+
+# 当前渲染会话状态（render_init时建立，render_complete/cancel时清除）
+_session = {}
+# 校准等内部渲染时暂停记录
+_recording = {'enabled': True}
+
+_PEAK_RE = re.compile(r"Peak:?\s*([\d.]+)\s*([KMG])", re.IGNORECASE)
+_UNIT_MB = {'K': 1.0 / 1024.0, 'M': 1.0, 'G': 1024.0}
+
+
+def parse_peak_memory(stats):
+    """从render_stats字符串解析峰值内存（MB），解析失败返回None"""
+    match = _PEAK_RE.search(stats or "")
+    if not match:
+        return None
+    try:
+        return float(match.group(1)) * _UNIT_MB[match.group(2).upper()]
+    except ValueError:
+        return None
+
+
+def current_preset_name(scene):
+    """从摄像机的Current对象名称中读取当前应用的预设名，没有预设时返回None"""
+    cam = scene.camera
+    if not cam:
+        return None
+    for child in cam.children:
+        if child.name.startswith("Current:"):
+            return child.name.split(':', 1)[1].split('[', 1)[0].strip()
+    return None
+
+
+def get_render_samples(scene):
+    """获取当前渲染引擎的采样数"""
+    engine = scene.render.engine
+    if engine == 'CYCLES' and hasattr(scene, 'cycles'):
+        return scene.cycles.samples
+    if engine.startswith('BLENDER_EEVEE') and hasattr(scene, 'eevee'):
+        return scene.eevee.taa_render_samples
+    return 0
+
+
+def set_recording(enabled):
+    """开启/暂停统计记录（内部探测渲染不应写入日志）"""
+    _recording['enabled'] = enabled
+
+
+def stats_log_path(scene):
+    """统计日志路径：与渲染输出在同一文件夹"""
+    output_dir = os.path.dirname(bpy.path.abspath(scene.render.filepath))
+    if not output_dir:
+        return None
+    return os.path.join(output_dir, STATS_LOG_NAME)
+
+
+def read_stats_log(path):
+    """读取jsonl日志，跳过损坏的行"""
+    records = []
+    if not path or not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def _append_record(path, record):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+@persistent
+def on_render_init(scene, *args):
+    _session.clear()
+    if not _recording['enabled']:
+        return
+    preset = current_preset_name(scene)
+    if preset is None:
+        return  # 只记录通过预设发起的渲染
+
+    render = scene.render
+    _session.update({
+        'preset': preset,
+        'engine': render.engine,
+        'samples': get_render_samples(scene),
+        'resolution': [
+            render.resolution_x * render.resolution_percentage // 100,
+            render.resolution_y * render.resolution_percentage // 100,
+        ],
+        'log_path': stats_log_path(scene),
+        'frame_start': None,
+        'peak_mb': None,
+    })
+
+
+@persistent
+def on_render_pre(scene, *args):
+    if not _session:
+        return
+    _session['frame_start'] = time.perf_counter()
+    _session['peak_mb'] = None
+
+
+@persistent
+def on_render_stats(stats, *args):
+    if not _session:
+        return
+    peak = parse_peak_memory(stats)
+    if peak is not None and (_session['peak_mb'] is None or peak > _session['peak_mb']):
+        _session['peak_mb'] = peak
+
+
+@persistent
+def on_render_post(scene, *args):
+    if not _session or _session['frame_start'] is None or not _session['log_path']:
+        return
+
+    frame = scene.frame_current
+    record = {
+        'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'blend': bpy.data.filepath,
+        'scene': scene.name,
+        'preset': _session['preset'],
+        'frame': frame,
+        'wall_time': round(time.perf_counter() - _session['frame_start'], 3),
+        'engine': _session['engine'],
+        'samples': _session['samples'],
+        'resolution': _session['resolution'],
+        'peak_memory_mb': _session['peak_mb'],
+        'output': bpy.path.abspath(scene.render.frame_path(frame=frame)),
+    }
+    try:
+        _append_record(_session['log_path'], record)
+    except OSError as e:
+        print(f"渲染统计写入失败: {e}")
+    _session['frame_start'] = None
+
+
+@persistent
+def on_render_end(scene, *args):
+    _session.clear()
+
+
+_handlers = [
+    (bpy.app.handlers.render_init, on_render_init),
+    (bpy.app.handlers.render_pre, on_render_pre),
+    (bpy.app.handlers.render_stats, on_render_stats),
+    (bpy.app.handlers.render_post, on_render_post),
+    (bpy.app.handlers.render_complete, on_render_end),
+    (bpy.app.handlers.render_cancel, on_render_end),
+]
+
+
+def register_handlers():
+    for handler_list, func in _handlers:
+        if func not in handler_list:
+            handler_list.append(func)
+
+
+def unregister_handlers():
+    for handler_list, func in _handlers:
+        if func in handler_list:
+            handler_list.remove(func)
+    _session.clear()
+
+
+class RENDER_OT_export_render_stats(Operator):
+    """导出当前输出文件夹的渲染统计为CSV"""
+    bl_idname = "render.export_render_stats"
+    bl_label = "导出渲染统计"
+    bl_description = "将当前预设输出文件夹下的渲染统计(jsonl)导出为CSV"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        log_path = stats_log_path(context.scene)
+        records = read_stats_log(log_path)
+        if not records:
+            self.report({'WARNING'}, "当前输出文件夹没有渲染统计记录")
+            return {'CANCELLED'}
+
+        csv_path = os.path.splitext(log_path)[0] + ".csv"
+        fields = ['time', 'blend', 'scene', 'preset', 'frame', 'wall_time', 'engine',
+                  'samples', 'resolution', 'peak_memory_mb', 'output']
+        try:
+            with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+                for record in records:
+                    row = dict(record)
+                    if isinstance(row.get('resolution'), list):
+                        row['resolution'] = "x".join(str(v) for v in row['resolution'])
+                    writer.writerow(row)
+        except OSError as e:
+            self.report({'ERROR'}, f"无法写入CSV: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"已导出 {len(records)} 条记录: {csv_path}")
+        return {'FINISHED'}
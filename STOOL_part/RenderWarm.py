@@ -0,0 +1,134 @@
+import bpy  # type: ignore
+from bpy.app.handlers import persistent  # type: ignore
+from bpy.props import BoolProperty  # type: ignore
+from bpy.types import Operator  # type: ignore
+from .RenderStats import parse_peak_memory, set_recording  # type: ignore
+
+# --------------------------
+# 保温渲染会话：Cycles保留持久数据，EEVEE先做低分辨率预热编译着色器；
+# 峰值内存超过阈值时自动结束会话
+# --------------------------
+
+# 已预热的场景名称
+_warmed_scenes = set()
+# 本次渲染的峰值内存（MB）
+_peak = {'mb': 0.0}
+
+WARMUP_MAX_SIZE = 64  # 预热渲染的最长边像素
+
+# 开启保温会话前用户自己的 use_persistent_data，结束会话时还原
+PERSISTENT_PROP = "stool_warm_persistent"
+
+
+def is_eevee(scene):
+    return scene.render.engine.startswith('BLENDER_EEVEE')
+
+
+def start_warm_session(scene):
+    """Cycles开启持久数据；只在第一次开启时记录用户原来的设置"""
+    if PERSISTENT_PROP not in scene:
+        scene[PERSISTENT_PROP] = int(scene.render.use_persistent_data)
+    scene.render.use_persistent_data = True
+
+
+def teardown_warm_session(scene):
+    """结束保温会话：还原持久数据设置，清除预热标记，并关闭面板开关"""
+    saved = scene.pop(PERSISTENT_PROP, None)
+    if saved is not None:
+        scene.render.use_persistent_data = bool(saved)
+    _warmed_scenes.discard(scene.name)
+    props = scene.render_preset_settings
+    if props.use_warm_session:
+        # 开关的回调会再次进入这里，此时已没有需要还原的内容
+        props.use_warm_session = False
+
+
+def update_warm_session(self, context):
+    """面板开关回调：关闭时立即结束会话"""
+    if not self.use_warm_session:
+        teardown_warm_session(context.scene)
+
+
+def _warmup_eevee(scene):
+    """用极低分辨率、1采样渲染一次，让EEVEE提前编译着色器"""
+    render = scene.render
+    saved = (render.resolution_percentage, scene.eevee.taa_render_samples)
+    longest = max(render.resolution_x, render.resolution_y)
+    render.resolution_percentage = max(1, min(100, WARMUP_MAX_SIZE * 100 // longest))
+    scene.eevee.taa_render_samples = 1
+    set_recording(False)
+    try:
+        bpy.ops.render.render(write_still=False, scene=scene.name)
+    finally:
+        set_recording(True)
+        render.resolution_percentage, scene.eevee.taa_render_samples = saved
+
+
+@persistent
+def on_warm_render_init(scene, *args):
+    _peak['mb'] = 0.0
+
+
+@persistent
+def on_warm_render_stats(stats, *args):
+    peak = parse_peak_memory(stats)
+    if peak is not None and peak > _peak['mb']:
+        _peak['mb'] = peak
+
+
+@persistent
+def on_warm_render_complete(scene, *args):
+    props = scene.render_preset_settings
+    if not props.use_warm_session:
+        return
+    if _peak['mb'] > props.warm_memory_limit:
+        teardown_warm_session(scene)
+        print(f"保温会话已结束：峰值内存 {_peak['mb']:.0f}MB 超过阈值 {props.warm_memory_limit}MB")
+
+
+_handlers = [
+    (bpy.app.handlers.render_init, on_warm_render_init),
+    (bpy.app.handlers.render_stats, on_warm_render_stats),
+    (bpy.app.handlers.render_complete, on_warm_render_complete),
+]
+
+
+def register_handlers():
+    for handler_list, func in _handlers:
+        if func not in handler_list:
+            handler_list.append(func)
+
+
+def unregister_handlers():
+    for handler_list, func in _handlers:
+        if func in handler_list:
+            handler_list.remove(func)
+    _warmed_scenes.clear()
+
+
+class RENDER_OT_warm_render(Operator):
+    """以保温会话方式渲染"""
+    bl_idname = "render.warm_render"
+    bl_label = "保温渲染"
+    bl_description = "开启保温会话时，Cycles保留持久数据，EEVEE先低分辨率预热着色器，再进行正式渲染"
+    bl_options = {'REGISTER'}
+
+    animation: BoolProperty(  # type: ignore
+        name="动画",
+        description="渲染整个帧范围",
+        default=False
+    )
+
+    def execute(self, context):
+        scene = context.scene
+        props = scene.render_preset_settings
+
+        if props.use_warm_session:
+            if scene.render.engine == 'CYCLES':
+                start_warm_session(scene)
+            elif is_eevee(scene) and scene.name not in _warmed_scenes:
+                _warmup_eevee(scene)
+                _warmed_scenes.add(scene.name)
+
+        bpy.ops.render.render('INVOKE_DEFAULT', animation=self.animation)
+        return {'FINISHED'}
@@ -0,0 +1,172 @@
+import bpy  # type: ignore
+from mathutils import Matrix, Vector  # type: ignore
+from .Spatial import centroid, origins, bounds_centers, kmeans  # type: ignore
+
+# --------------------------
+# 声明式搭建：用一组节点描述 空物体/摄像机/灯光、父子级和约束，
+# 全部通过 bpy.data 创建（不走bpy.ops，不改变活跃对象），最后只刷新一次视图层；
+# 不依赖3D视图，后台脚本中也可以调用
+#
+# 节点为dict：
+#   key        节点标识，parent / 约束target 用它互相引用
+#   name       物体名称
+#   type       'EMPTY' / 'CAMERA' / 'LIGHT'
+#   data       可选，直接使用已有的数据块（多个灯光共享同一个灯光数据）
+#   light_type LIGHT 没有 data 时新建灯光的类型
+#   parent     父节点key（无逆矩阵，location 即父级空间坐标）
+#   location / rotation / scale
+#   lock_location / lock_rotation / lock_scale
+#   constraints [{'type': ..., 'target': key, 其他约束属性...}]
+# --------------------------
+
+
+def _new_object(node):
+    kind = node.get('type', 'EMPTY')
+    data = node.get('data')
+    if data is None and kind == 'CAMERA':
+        data = bpy.data.cameras.new(node['name'])
+    elif data is None and kind == 'LIGHT':
+        data = bpy.data.lights.new(node['name'], node.get('light_type', 'POINT'))
+    return bpy.data.objects.new(node['name'], data)
+
+
+def build_rig(nodes, collection, update=True):
+    """按节点列表创建物体并链接到集合，返回 {key: 物体}；
+    同时搭建多套时可传 update=False，全部完成后再统一刷新"""
+    objects = {}
+    for node in nodes:
+        obj = _new_object(node)
+        collection.objects.link(obj)
+        objects[node['key']] = obj
+
+    # 物体都创建好后再设置父级和约束，节点顺序不影响引用
+    for node in nodes:
+        obj = objects[node['key']]
+        if node.get('parent'):
+            obj.parent = objects[node['parent']]
+        for attr in ('location', 'rotation', 'scale',
+                     'lock_location', 'lock_rotation', 'lock_scale'):
+            if attr in node:
+                setattr(obj, 'rotation_euler' if attr == 'rotation' else attr, node[attr])
+        for spec in node.get('constraints', ()):
+            constraint = obj.constraints.new(spec['type'])
+            for attr, value in spec.items():
+                if attr == 'type':
+                    continue
+                if attr == 'target':
+                    value = objects[value]
+                setattr(constraint, attr, value)
+
+    if update:
+        bpy.context.view_layer.update()
+    return objects
+
+
+def target_collection(context):
+    """新物体放入的集合：当前活跃集合，没有时用场景根集合"""
+    return getattr(context, 'collection', None) or context.scene.collection
+
+
+def view_camera_matrix(context):
+    """当前3D视图的相机矩阵；没有3D视图时（后台）使用场景相机，再没有则为单位矩阵"""
+    space = getattr(context, 'space_data', None)
+    if space and space.type == 'VIEW_3D':
+        return space.region_3d.view_matrix.inverted()
+    if context.scene.camera:
+        return context.scene.camera.matrix_world.copy()
+    return Matrix.Identity(4)
+
+
+def cspzt_rig_nodes(target, cam_location, cam_rotation):
+    """C-SP-ZT朝向摄像机组：Central(目标点) > Stare > Protection > Cam / DOFTarget，
+    Stare朝向Central并通过Zup锁定向上方向"""
+    return [
+        {'key': 'central', 'name': 'Cam_Central--↑（向上添加目标点运动）',
+         'location': target, 'rotation': cam_rotation},
+        {'key': 'zup', 'name': 'Cam_Zup', 'location': (0, 0, 100000)},
+        {'key': 'stare', 'name': 'Cam_Stare--↑（向上添加摄像机运动）',
+         'parent': 'central', 'location': cam_location,
+         'constraints': [
+             {'type': 'DAMPED_TRACK', 'target': 'central', 'track_axis': 'TRACK_NEGATIVE_Z'},
+             {'type': 'LOCKED_TRACK', 'target': 'zup', 'track_axis': 'TRACK_Y', 'lock_axis': 'LOCK_Z'},
+         ]},
+        {'key': 'protection', 'name': 'Cam_Protection--↑（向上添加局部空间运动）',
+         'parent': 'stare'},
+        {'key': 'dof_target', 'name': 'Cam_DOFTarget', 'parent': 'protection',
+         'location': (0, 0, -1),
+         'lock_location': (True, True, False),
+         'lock_rotation': (True, True, True),
+         'lock_scale': (True, True, True)},
+        {'key': 'camera', 'name': 'Cam', 'type': 'CAMERA', 'parent': 'protection',
+         'lock_location': (True, True, True),
+         'lock_rotation': (True, True, True),
+         'lock_scale': (True, True, True)},
+    ]
+
+
+def fast_camera_rig_nodes(target, cam_matrix):
+    """C-P摄像机组：Central(目标点) > Protection(朝向Central) > Camera(PSR锁定)"""
+    cam_location = cam_matrix.to_translation()
+    return [
+        {'key': 'central', 'name': 'Camera Central', 'location': target},
+        {'key': 'protection', 'name': 'Camera Protection', 'parent': 'central',
+         'location': cam_location - Vector(target),
+         'rotation': cam_matrix.to_3x3().normalized().to_euler(),
+         'constraints': [
+             {'type': 'DAMPED_TRACK', 'target': 'central', 'track_axis': 'TRACK_NEGATIVE_Z'},
+         ]},
+        {'key': 'camera', 'name': 'Camera', 'type': 'CAMERA', 'parent': 'protection',
+         'lock_location': (True, True, True),
+         'lock_rotation': (True, True, True)},
+    ]
+
+
+def light_rig_nodes(target, light_data):
+    """中心约束灯光：空物体(目标点) > 灯光(Damped Track朝向空物体)"""
+    return [
+        {'key': 'group', 'name': '约束灯光组', 'location': target},
+        {'key': 'light', 'name': '约束灯光', 'type': 'LIGHT', 'data': light_data,
+         'parent': 'group',
+         'constraints': [
+             {'type': 'DAMPED_TRACK', 'target': 'group', 'track_axis': 'TRACK_NEGATIVE_Z'},
+         ]},
+    ]
+
+
+def build_cspzt_rig(collection, target, cam_location, cam_rotation, update=True):
+    rig = build_rig(cspzt_rig_nodes(target, cam_location, cam_rotation), collection, update)
+    camera_data = rig['camera'].data
+    camera_data.dof.use_dof = True
+    camera_data.dof.focus_object = rig['dof_target']
+    return rig
+
+
+def build_fast_camera_rig(collection, target, cam_matrix, update=True):
+    return build_rig(fast_camera_rig_nodes(target, cam_matrix), collection, update)
+
+
+def object_centers(objs, use_bounds=False):
+    """每个物体的中心：原点，或包围盒中心（全部物体一次计算）"""
+    points = bounds_centers(objs) if use_bounds else origins(objs)
+    return [tuple(point) for point in points.tolist()]
+
+
+def rig_targets(objs, per_object=False, use_bounds=False):
+    """目标点列表：整体一个，或每个所选物体一个"""
+    if not objs:
+        return [(0.0, 0.0, 0.0)]
+    if per_object:
+        return object_centers(objs, use_bounds)
+    return [centroid(objs, use_bounds)]
+
+
+def cluster_targets(objs, count, use_bounds=False):
+    """按物体位置做k-means聚类，每个簇中心一个目标点"""
+    if not objs:
+        return [(0.0, 0.0, 0.0)]
+    _, centers = kmeans(object_centers(objs, use_bounds), count)
+    return [tuple(center) for center in centers.tolist()]
+
+
+def build_light_rig(collection, target, light_data, update=True):
+    return build_rig(light_rig_nodes(target, light_data), collection, update)
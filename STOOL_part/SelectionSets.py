@@ -0,0 +1,263 @@
+import json
+from collections import Counter
+import bpy  # type: ignore
+from bpy.app.handlers import persistent  # type: ignore
+from bpy.props import (IntProperty, EnumProperty,  # type: ignore
+                       PointerProperty, CollectionProperty)
+from bpy.types import Operator, PropertyGroup, UIList  # type: ignore
+
+# --------------------------
+# 选择组：场景上的 CollectionProperty，每项保存物体指针（重命名不影响），
+# 不再为每个选择组创建空物体和文本块；旧版“选择组_”空物体可一键迁移
+# 注意：物体指针会给物体增加一个真实用户，被删除的物体只是离开了所有集合，
+# 仍留在 bpy.data 中并会随工程保存；保存前清除只被选择组引用的物体
+# （用户数不超过选择组的引用数；伪用户、骨骼形状等其他用户都会保留物体）
+# --------------------------
+
+LEGACY_PREFIX = "选择组_"
+# 选择组名称中列出的物体数，其余只显示数量
+NAME_OBJECTS = 3
+
+SET_OPERATIONS = [
+    ('UNION', "并集", "当前选择 + 选择组"),
+    ('INTERSECT', "交集", "当前选择中同时属于选择组的物体"),
+    ('DIFFERENCE', "差集", "当前选择中去掉选择组的物体"),
+]
+
+
+class SelectionSetItem(PropertyGroup):
+    obj: PointerProperty(type=bpy.types.Object)  # type: ignore
+
+
+class SelectionSet(PropertyGroup):
+    objects: CollectionProperty(type=SelectionSetItem)  # type: ignore
+
+
+class SelectionSetProperties(PropertyGroup):
+    sets: CollectionProperty(type=SelectionSet)  # type: ignore
+    active_index: IntProperty(default=0)  # type: ignore
+
+
+def set_name(objs):
+    """与旧版一致的选择组命名：每个物体名最多8个字符，只列出前几个物体，其余显示数量"""
+    parts = [obj.name if len(obj.name) <= 8 else obj.name[:8] + "..."
+             for obj in objs[:NAME_OBJECTS]]
+    name = LEGACY_PREFIX + ",".join(parts)
+    if len(objs) > NAME_OBJECTS:
+        name += f"…(+{len(objs) - NAME_OBJECTS})"
+    return name
+
+
+def add_selection_set(scene, objs, name=None):
+    props = scene.selection_set_props
+    selection_set = props.sets.add()
+    selection_set.name = name or set_name(objs)
+    items = selection_set.objects
+    for obj in objs:
+        items.add().obj = obj
+    props.active_index = len(props.sets) - 1
+    return selection_set
+
+
+def set_objects(selection_set):
+    """选择组中的物体（去重，保持顺序）；不在当前视图层的物体由 apply_selection 跳过"""
+    return list(dict.fromkeys(item.obj for item in selection_set.objects if item.obj))
+
+
+def _set_references():
+    """所有场景的选择组对每个物体的引用数（每个指针都是物体的一个用户）"""
+    refs = Counter()
+    for scene in bpy.data.scenes:
+        for selection_set in scene.selection_set_props.sets:
+            refs.update(item.obj for item in selection_set.objects if item.obj)
+    return refs
+
+
+def prune_deleted_objects():
+    """从所有场景的选择组中移除只被选择组引用的物体（已被删除），
+    让它们不再因选择组而被保存；返回移除的数量"""
+    refs = _set_references()
+    removed = 0
+    for scene in bpy.data.scenes:
+        for selection_set in scene.selection_set_props.sets:
+            items = selection_set.objects
+            # 倒序删除，序号不受影响
+            for i in reversed(range(len(items))):
+                obj = items[i].obj
+                if obj is None or obj.users <= refs[obj]:
+                    items.remove(i)
+                    removed += 1
+    return removed
+
+
+def active_set(scene):
+    props = scene.selection_set_props
+    if 0 <= props.active_index < len(props.sets):
+        return props.sets[props.active_index]
+    return None
+
+
+def apply_selection(context, objs):
+    """一次性还原选择：只处理当前视图层中的物体，最后一个设为活跃"""
+    layer_objects = context.view_layer.objects
+    visible = set(layer_objects)
+    targets = [obj for obj in objs if obj in visible]
+    for obj in context.selected_objects:
+        obj.select_set(False)
+    for obj in targets:
+        obj.select_set(True)
+    if targets:
+        layer_objects.active = targets[-1]
+    return len(targets)
+
+
+def migrate_legacy_sets(scene):
+    """把旧版“选择组_”空物体 + 文本块转换为选择组，并删除它们，返回迁移的数量"""
+    legacy = [obj for obj in scene.objects
+              if obj.type == 'EMPTY' and obj.name.startswith(LEGACY_PREFIX)
+              and "selection_data" in obj]
+    to_remove = []
+    for group in legacy:
+        text = bpy.data.texts.get(group["selection_data"])
+        if not text:
+            continue
+        try:
+            names = [entry['name'] for entry in json.loads(text.as_string())]
+        except (ValueError, KeyError, TypeError):
+            continue
+        objs = [bpy.data.objects[name] for name in names if name in bpy.data.objects]
+        add_selection_set(scene, objs, name=group.name)
+        to_remove.extend((group, text))
+    if to_remove:
+        bpy.data.batch_remove(to_remove)
+    return len(to_remove) // 2
+
+
+class SaveSelection(Operator):
+    bl_idname = "object.save_selection_visn"
+    bl_label = "保存【选择组】"
+    bl_description = "将当前选择的对象保存为选择组（按物体引用保存，重命名不影响）"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        selected_objs = context.selected_objects
+        if not selected_objs:
+            self.report({'WARNING'}, "没有选择任何对象")
+            return {'CANCELLED'}
+        add_selection_set(context.scene, selected_objs)
+        self.report({'INFO'}, f"当前选择已保存（{len(selected_objs)} 个对象）")
+        return {'FINISHED'}
+
+
+class LoadSelection(Operator):
+    bl_idname = "object.load_selection_visn"
+    bl_label = "读取【选择组】"
+    bl_description = "还原列表中选中的选择组；选中旧版“选择组”对象时先迁移再还原"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        scene = context.scene
+        active_obj = context.view_layer.objects.active
+        if active_obj and active_obj.name.startswith(LEGACY_PREFIX) and "selection_data" in active_obj:
+            legacy_name = active_obj.name
+            migrate_legacy_sets(scene)
+            props = scene.selection_set_props
+            props.active_index = next(
+                (i for i, s in enumerate(props.sets) if s.name == legacy_name), props.active_index)
+
+        selection_set = active_set(scene)
+        if not selection_set:
+            self.report({'WARNING'}, "请先在列表中选择一个选择组")
+            return {'CANCELLED'}
+
+        count = apply_selection(context, set_objects(selection_set))
+        self.report({'INFO'}, f"选择状态已还原（{count} 个对象）")
+        return {'FINISHED'}
+
+
+class OBJECT_OT_selection_set_combine(Operator):
+    bl_idname = "object.selection_set_combine_visn"
+    bl_label = "选择组运算"
+    bl_description = "用当前选择和列表中选中的选择组做并集/交集/差集，结果设为当前选择"
+    bl_options = {"REGISTER", "UNDO"}
+
+    operation: EnumProperty(items=SET_OPERATIONS, default='UNION')  # type: ignore
+
+    def execute(self, context):
+        selection_set = active_set(context.scene)
+        if not selection_set:
+            self.report({'WARNING'}, "请先在列表中选择一个选择组")
+            return {'CANCELLED'}
+
+        current = list(context.selected_objects)
+        members = set_objects(selection_set)
+        if self.operation == 'UNION':
+            result = list(dict.fromkeys(current + members))
+        elif self.operation == 'INTERSECT':
+            member_set = set(members)
+            result = [obj for obj in current if obj in member_set]
+        else:
+            member_set = set(members)
+            result = [obj for obj in current if obj not in member_set]
+
+        count = apply_selection(context, result)
+        self.report({'INFO'}, f"已选中 {count} 个对象")
+        return {'FINISHED'}
+
+
+class OBJECT_OT_selection_set_remove(Operator):
+    bl_idname = "object.selection_set_remove_visn"
+    bl_label = "删除选择组"
+    bl_description = "删除列表中选中的选择组（不影响物体）"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        props = context.scene.selection_set_props
+        if not active_set(context.scene):
+            return {'CANCELLED'}
+        props.sets.remove(props.active_index)
+        props.active_index = min(props.active_index, len(props.sets) - 1)
+        return {'FINISHED'}
+
+
+class OBJECT_OT_selection_set_migrate(Operator):
+    bl_idname = "object.selection_set_migrate_visn"
+    bl_label = "迁移旧版选择组"
+    bl_description = "把旧版的“选择组_”空物体和文本块转换为选择组列表，并删除它们"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        count = migrate_legacy_sets(context.scene)
+        self.report({'INFO'}, f"已迁移 {count} 个旧版选择组")
+        return {'FINISHED'}
+
+
+class OBJECT_UL_selection_sets(UIList):
+    """选择组列表：名称可双击重命名，右侧显示物体数"""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "name", text="", emboss=False, icon='RESTRICT_SELECT_OFF')
+        row.label(text=str(len(item.objects)))
+
+
+@persistent
+def on_save_pre(*args):
+    prune_deleted_objects()
+
+
+_handlers = [
+    (bpy.app.handlers.save_pre, on_save_pre),
+]
+
+
+def register_handlers():
+    for handler_list, func in _handlers:
+        if func not in handler_list:
+            handler_list.append(func)
+
+
+def unregister_handlers():
+    for handler_list, func in _handlers:
+        if func in handler_list:
+            handler_list.remove(func)
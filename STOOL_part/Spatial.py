@@ -0,0 +1,127 @@
+import numpy as np
+import bpy  # type: ignore
+
+# --------------------------
+# 选择集的空间信息：中心点、AABB、包围球
+# 选择集占文件中物体的大部分时，用 foreach_get 一次读出所有物体的 matrix_world / bound_box，
+# 否则逐个读取（foreach_get 总要读取整个文件的数据，还要遍历一次 bpy.data.objects 找行号）
+# 注意：foreach_get 得到的矩阵按列存储，raw[n][列][行]，平移在 raw[:, 3, :3]
+# --------------------------
+
+# 选择集超过这个数量，并且至少占文件中物体的 BULK_FRACTION 时走 foreach_get
+BULK_THRESHOLD = 256
+BULK_FRACTION = 0.5
+
+
+def _use_bulk(objs):
+    return len(objs) > BULK_THRESHOLD and len(objs) >= len(bpy.data.objects) * BULK_FRACTION
+
+
+def _bulk_read(objs, attr, shape):
+    """从 bpy.data.objects 一次性读取属性，按 objs 的顺序返回对应的行"""
+    collection = bpy.data.objects
+    buffer = np.empty(len(collection) * int(np.prod(shape)), dtype=np.float32)
+    collection.foreach_get(attr, buffer)
+    buffer = buffer.reshape((len(collection),) + shape)
+    index = {obj: i for i, obj in enumerate(collection)}
+    return buffer[[index[obj] for obj in objs]]
+
+
+def world_matrices(objs):
+    """(n, 4, 4) 按列存储的世界矩阵"""
+    if _use_bulk(objs):
+        return _bulk_read(objs, "matrix_world", (4, 4))
+    # mathutils.Matrix 按行迭代，转置成与 foreach_get 相同的按列存储
+    return np.array([obj.matrix_world for obj in objs], dtype=np.float32).transpose(0, 2, 1)
+
+
+def local_bound_boxes(objs):
+    """(n, 8, 3) 物体空间的包围盒角点"""
+    if _use_bulk(objs):
+        return _bulk_read(objs, "bound_box", (8, 3))
+    return np.array([[corner[:] for corner in obj.bound_box] for obj in objs], dtype=np.float32)
+
+
+def origins(objs):
+    """(n, 3) 物体原点的世界坐标"""
+    return world_matrices(objs)[:, 3, :3]
+
+
+def world_points(objs, use_bounds=False):
+    """参与计算的世界坐标点：原点，或包围盒的8个角点"""
+    if not objs:
+        return np.zeros((0, 3), dtype=np.float32)
+    if not use_bounds:
+        return origins(objs)
+    matrices = world_matrices(objs)
+    corners = local_bound_boxes(objs)
+    homogeneous = np.concatenate([corners, np.ones(corners.shape[:2] + (1,), dtype=np.float32)], axis=2)
+    # 按列存储时 点 @ raw 即为 M @ 点
+    return (homogeneous @ matrices)[:, :, :3].reshape(-1, 3)
+
+
+def aabb(objs, use_bounds=True):
+    """世界空间轴对齐包围盒 (最小点, 最大点)"""
+    points = world_points(objs, use_bounds)
+    if not len(points):
+        return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+    return tuple(points.min(axis=0).tolist()), tuple(points.max(axis=0).tolist())
+
+
+def bounding_sphere(objs, use_bounds=True):
+    """以AABB中心为球心的包围球 (球心, 半径)"""
+    points = world_points(objs, use_bounds)
+    if not len(points):
+        return (0.0, 0.0, 0.0), 0.0
+    center = (points.min(axis=0) + points.max(axis=0)) / 2
+    radius = float(np.sqrt(((points - center) ** 2).sum(axis=1).max()))
+    return tuple(center.tolist()), radius
+
+
+def bounds_centers(objs):
+    """(n, 3) 每个物体世界空间AABB的中心，一次读取全部包围盒"""
+    if not objs:
+        return np.zeros((0, 3), dtype=np.float32)
+    corners = world_points(objs, True).reshape(len(objs), 8, 3)
+    return (corners.min(axis=1) + corners.max(axis=1)) / 2
+
+
+def centroid(objs, use_bounds=False):
+    """不使用包围盒时为原点的平均值；使用包围盒时为整体AABB的中心"""
+    if not objs:
+        return (0.0, 0.0, 0.0)
+    if use_bounds:
+        low, high = aabb(objs, True)
+        return tuple((a + b) / 2 for a, b in zip(low, high))
+    return tuple(origins(objs).mean(axis=0, dtype=np.float64).tolist())
+
+
+def local_centroid(objs):
+    """location（父级空间坐标）的平均值"""
+    return tuple(np.array([obj.location[:] for obj in objs], dtype=np.float64).mean(axis=0).tolist())
+
+
+def kmeans(points, k, iterations=20, seed=0):
+    """k-means聚类，返回 (每个点的簇序号, 簇中心)；k-means++初始化，固定随机种子保证结果可重复"""
+    points = np.asarray(points, dtype=np.float64)
+    k = max(1, min(k, len(points)))
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        distances = ((points[:, None, :] - np.array(centers)[None]) ** 2).sum(axis=2).min(axis=1)
+        total = distances.sum()
+        if total == 0:
+            break  # 剩下的点都与已有中心重合
+        centers.append(points[rng.choice(len(points), p=distances / total)])
+    centers = np.array(centers)
+
+    labels = np.zeros(len(points), dtype=int)
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        new_centers = np.array([points[labels == i].mean(axis=0) if (labels == i).any() else centers[i]
+                                for i in range(len(centers))])
+        if np.allclose(new_centers, centers):
+            break
+        centers = new_centers
+    return labels, centers
@@ -1,8 +1,9 @@
 
 import bpy  # type: ignore
 import os
-import json
-from .ParentsOps import centro_global  # type: ignore
+from .Hierarchy import HierarchyIndex  # type: ignore
+from .RigBuilder import (build_fast_camera_rig, build_cspzt_rig, build_light_rig,  # type: ignore
+                         rig_targets, cluster_targets, target_collection, view_camera_matrix)
 
 import subprocess
 import platform
@@ -10,96 +11,72 @@ import platform
 from collections import deque
 
 
+# 预览时在报告中列出的名称数
+PREVIEW_NAMES = 10
+
+
 class DeleteEmptyNull(bpy.types.Operator):
     bl_idname = "object.delete_empty_null_visn"
     bl_label = "删除无内容的Empty"
     bl_description = "删除场景中所有没有子级且没有数据的空物体，保护集合实例"
     bl_options = {"REGISTER", "UNDO"}
 
+    dry_run: bpy.props.BoolProperty(  # type: ignore
+        name="仅预览",
+        description="只列出将被删除的空对象，不做修改",
+        default=False
+    )
+
     @staticmethod
     def is_collection_instance(obj):
         """检查对象是否是集合实例"""
         return hasattr(obj, 'instance_type') and obj.instance_type == 'COLLECTION'
 
-    def delete_empty_objects_without_children(self):
-        """删除所有没有有效子物体的空对象，但保护集合实例"""
-        # 获取所有空对象
-        empty_objects = [
-            obj for obj in bpy.data.objects if obj.type == 'EMPTY']
-
-        if not empty_objects:
-            return 0
+    def find_empty_objects_without_children(self):
+        """找出所有没有有效子物体的空对象，但保护集合实例。
+        有效：集合实例、有非空子物体、或有需要保留的空子物体；单次后序遍历完成"""
+        empties = {obj for obj in bpy.data.objects if obj.type == 'EMPTY'}
+        if not empties:
+            return []
 
-        # 创建一个字典来记录每个对象是否应该保留
+        hierarchy = HierarchyIndex()
         should_keep = {}
-
-        # 初始化：集合实例应该保留，其他空对象默认不保留
-        for obj in empty_objects:
-            should_keep[obj] = self.is_collection_instance(obj)
-
-        # 第一遍：标记所有直接包含非空子对象的空对象
-        for obj in empty_objects:
-            if not should_keep[obj]:
-                for child in obj.children:
-                    if child.type != 'EMPTY' or self.is_collection_instance(child):
-                        should_keep[obj] = True
-                        break
-
-        # 使用队列进行广度优先搜索，从下往上标记应该保留的对象
-        # 先收集所有空对象和它们的层级关系
-        level_dict = {}
-        for obj in empty_objects:
-            level = 0
-            current = obj
-            while current.parent and current.parent in empty_objects:
-                current = current.parent
-                level += 1
-            level_dict[obj] = level
-
-        # 按层级从高到低排序（从最底层开始）
-        sorted_objects = sorted(
-            empty_objects, key=lambda x: level_dict[x], reverse=True)
-
-        # 从底层向上标记
-        for obj in sorted_objects:
-            if not should_keep[obj]:
-                # 检查所有子对象，如果任何子对象应该保留，那么这个对象也应该保留
-                for child in obj.children:
-                    if child in should_keep and should_keep[child]:
-                        should_keep[obj] = True
-                        break
-
-        # 找出应该删除的空对象
-        to_delete = [obj for obj in empty_objects if not should_keep[obj]]
-
-        if not to_delete:
-            return 0
-
-        # 先解除所有父子关系
-        for obj in to_delete:
-            for child in list(obj.children):
-                child.parent = None
-
-        # 删除这些对象
-        delete_count = 0
-        for obj in to_delete:
-            try:
-                bpy.data.objects.remove(obj, do_unlink=True)
-                delete_count += 1
-            except ReferenceError:
-                # 对象可能已经被删除，跳过
+        # 从每棵“空对象子树”的顶端出发（父级不是空对象），迭代后序遍历，子级先于父级判定
+        for top in empties:
+            if hierarchy.parent(top) in empties:
                 continue
-
-        return delete_count
+            stack = [(top, False)]
+            while stack:
+                obj, expanded = stack.pop()
+                if not expanded:
+                    stack.append((obj, True))
+                    stack.extend((child, False) for child in hierarchy.children(obj)
+                                 if child in empties)
+                    continue
+                should_keep[obj] = self.is_collection_instance(obj) or any(
+                    child not in empties or should_keep[child]
+                    for child in hierarchy.children(obj))
+
+        return [obj for obj in bpy.data.objects
+                if obj in empties and not should_keep[obj]]
 
     def execute(self, context):
-        deleted_count = self.delete_empty_objects_without_children()
-
-        if deleted_count > 0:
-            self.report({'INFO'}, f"删除了 {deleted_count} 个无内容的空对象")
-        else:
+        to_delete = self.find_empty_objects_without_children()
+        if not to_delete:
             self.report({'INFO'}, "没有找到需要删除的空对象")
-
+            return {'FINISHED'}
+
+        if self.dry_run:
+            names = ", ".join(obj.name for obj in to_delete[:PREVIEW_NAMES])
+            if len(to_delete) > PREVIEW_NAMES:
+                names += f"…(+{len(to_delete) - PREVIEW_NAMES})"
+            self.report({'INFO'}, f"[预览] 将删除 {len(to_delete)} 个无内容的空对象: {names}")
+            return {'FINISHED'}
+
+        # 需要删除的空对象的子级也都在删除列表中，一次性批量删除
+        deleted_count = len(to_delete)
+        bpy.data.batch_remove(to_delete)
+        self.report({'INFO'}, f"删除了 {deleted_count} 个无内容的空对象")
         return {'FINISHED'}
 
 
@@ -109,39 +86,32 @@ class FastCentreCamera(bpy.types.Operator):
     bl_description = "创建一个以选择物体为目标点的，中心点+PSR锁定的的摄像机"
     bl_options = {"REGISTER", "UNDO"}
 
+    use_bounds: bpy.props.BoolProperty(  # type: ignore
+        name="按几何包围盒",
+        description="以所选物体几何包围盒的中心为目标点，而不是原点的平均位置",
+        default=False
+    )
+    per_object: bpy.props.BoolProperty(  # type: ignore
+        name="每个物体一组",
+        description="为每个所选物体各创建一组摄像机",
+        default=False
+    )
+
     def execute(self, context):
-        # 获取创建点
+        # 获取创建点，摄像机位置取当前视图
         objs = context.selected_objects
-        loc = centro_global(objs) if objs else (0, 0, 0)
-
-        # 创建摄像机
-        bpy.ops.object.camera_add(enter_editmode=False, align='VIEW', location=(
-            0, 0, 0), rotation=(0, 0, 0), scale=(1, 1, 1))
-        bpy.context.active_object.name = 'Camera'
-        cams = context.selected_objects
-        bpy.context.space_data.camera = cams[0]
-        bpy.ops.view3d.camera_to_view()
-        bpy.ops.object.add(
-            type='EMPTY', location=cams[0].location, rotation=cams[0].rotation_euler)
-        bpy.context.active_object.name = 'Camera Protection'
-        bpy.ops.object.constraint_add(type='DAMPED_TRACK')
-        camP = context.selected_objects
-        cams[0].select_set(True)
-        bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-        cams[0].lock_location[:] = [True, True, True]
-        cams[0].lock_rotation[:] = [True, True, True]
-
-        # 创建原点的空物体
-        bpy.ops.object.add(type='EMPTY', location=loc)
-        bpy.context.active_object.name = 'Camera Central'
-        camC = context.selected_objects
-        camP[0].select_set(True)
-        bpy.ops.object.parent_no_inverse_set(keep_transform=True)
-        camP[0].select_set(False)
-        cams[0].select_set(False)
-        camP[0].constraints["Damped Track"].target = bpy.data.objects[camC[0].name]
-        camP[0].constraints["Damped Track"].track_axis = 'TRACK_NEGATIVE_Z'
-
+        cam_matrix = view_camera_matrix(context)
+        collection = target_collection(context)
+
+        rigs = [build_fast_camera_rig(collection, target, cam_matrix, update=False)
+                for target in rig_targets(objs, self.per_object, self.use_bounds)]
+        context.view_layer.update()
+
+        cam = rigs[-1]['camera']
+        space = getattr(context, 'space_data', None)
+        if space and space.type == 'VIEW_3D':
+            space.camera = cam
+        self.report({'INFO'}, f"已创建 {len(rigs)} 组摄像机")
         return {'FINISHED'}
 
 
@@ -151,81 +121,35 @@ class CSPZT_Camera(bpy.types.Operator):
     bl_description = "创建包含Central、Stare、Protection、Target和Zup的复杂摄像机组"
     bl_options = {"REGISTER", "UNDO"}
 
+    use_bounds: bpy.props.BoolProperty(  # type: ignore
+        name="按几何包围盒",
+        description="以所选物体几何包围盒的中心为目标点，而不是原点的平均位置",
+        default=False
+    )
+    per_object: bpy.props.BoolProperty(  # type: ignore
+        name="每个物体一组",
+        description="为每个所选物体各创建一组摄像机（例如每个产品一个环绕机位）",
+        default=False
+    )
+
     def execute(self, context):
         # 获取创建点
         objs = context.selected_objects
-        loc = centro_global(objs) if objs else (0, 0, 0)
         # 获取当前视图的摄像机位置和旋转
-        view_matrix = context.space_data.region_3d.view_matrix
-        cam_location = view_matrix.inverted().translation
-        cam_rotation = view_matrix.to_3x3().inverted().to_euler()
-
-        # 创建Cam_Central--↑ (根空物体)
-        bpy.ops.object.add(type='EMPTY', location=loc)
-        central = context.active_object
-        central.name = 'Cam_Central--↑（向上添加目标点运动）'
-        central.rotation_euler = cam_rotation
-
-        # 创建Cam_Zup (世界空间，不设为任何物体的子级)
-        bpy.ops.object.add(type='EMPTY', location=(0, 0, 100000))
-        zup = context.active_object
-        zup.name = 'Cam_Zup'
-
-        # 创建Cam_Stare (作为Central的子对象)
-        bpy.ops.object.add(type='EMPTY', location=cam_location)
-        stare = context.active_object
-        stare.name = 'Cam_Stare--↑（向上添加摄像机运动）'
-        stare.parent = central
-        # stare.location = (0, 0, 0)  # PSR=0
-
-        # 添加约束到Stare
-        # Damped Track指向Central, 轴为-Z
-        damped_track = stare.constraints.new('DAMPED_TRACK')
-        damped_track.target = central
-        damped_track.track_axis = 'TRACK_NEGATIVE_Z'
-
-        # Locked Track指向Zup, 跟踪Y轴, 锁定Z轴
-        locked_track = stare.constraints.new('LOCKED_TRACK')
-        locked_track.target = zup
-        locked_track.track_axis = 'TRACK_Y'
-        locked_track.lock_axis = 'LOCK_Z'
-
-        # 创建Cam_Protection--↑ (作为Stare的子对象)
-        bpy.ops.object.add(type='EMPTY', location=(0, 0, 0))
-        protection = context.active_object
-        protection.name = 'Cam_Protection--↑（向上添加局部空间运动）'
-        protection.parent = stare
-        protection.location = (0, 0, 0)  # PSR=0
-        protection.rotation_euler = (0, 0, 0)
-        protection.scale = (1, 1, 1)
-
-        # 创建Cam_DOFTarget (作为Protection的子对象)
-        bpy.ops.object.add(type='EMPTY', location=(0, 0, -1))  # 初始Z=-1
-        dof_target = context.active_object
-        dof_target.name = 'Cam_DOFTarget'
-        dof_target.parent = protection
-        dof_target.lock_location = (True, True, False)  # 仅Z轴可移动
-        dof_target.lock_rotation = (True, True, True)  # 全锁定
-        dof_target.lock_scale = (True, True, True)  # 全锁定
-
-        # 创建摄像机 (作为Protection的子对象)
-        bpy.ops.object.camera_add(enter_editmode=False, location=(0, 0, 0))
-        cam = context.active_object
-        cam.name = 'Cam'
-        cam.parent = protection
-        cam.location = (0, 0, 0)  # PSR=0
-        cam.rotation_euler = (0, 0, 0)
-        cam.lock_location = (True, True, True)
-        cam.lock_rotation = (True, True, True)
-        cam.lock_scale = (True, True, True)
-
-        # 启用景深并设置焦点目标
-        cam.data.dof.use_dof = True
-        cam.data.dof.focus_object = dof_target
+        cam_matrix = view_camera_matrix(context)
+        cam_location = cam_matrix.to_translation()
+        cam_rotation = cam_matrix.to_3x3().normalized().to_euler()
+        collection = target_collection(context)
+
+        rigs = [build_cspzt_rig(collection, target, cam_location, cam_rotation, update=False)
+                for target in rig_targets(objs, self.per_object, self.use_bounds)]
+        context.view_layer.update()
 
         # 设置当前视图的相机并进入摄像机视图
-        context.space_data.camera = cam
-        bpy.ops.view3d.view_camera()
+        space = getattr(context, 'space_data', None)
+        if space and space.type == 'VIEW_3D':
+            space.camera = rigs[-1]['camera']
+            bpy.ops.view3d.view_camera()
 
         return {'FINISHED'}
 
@@ -254,12 +178,36 @@ class OpenProjectFolderOperator(bpy.types.Operator):
         return {'FINISHED'}
 
 
+LIGHT_RIG_MODES = [
+    ('SINGLE', "整体", "在所有所选物体的中心创建一组灯光"),
+    ('PER_OBJECT', "每个物体", "为每个所选物体各创建一组灯光"),
+    ('CLUSTER', "按聚类", "按位置把所选物体聚成N组，每组创建一组灯光"),
+]
+
+
 class AddLightWithConstraint(bpy.types.Operator):
     bl_idname = "object.add_light_with_constraint"
     bl_label = "中心约束灯光"
     bl_description = "在所选物体的位置创建一个空对象，并在其子级创建一个灯光，设置 Damped Track 约束"
     bl_options = {"REGISTER", "UNDO"}
 
+    use_bounds: bpy.props.BoolProperty(  # type: ignore
+        name="按几何包围盒",
+        description="以所选物体几何包围盒的中心为目标点，而不是原点的平均位置",
+        default=False
+    )
+    mode: bpy.props.EnumProperty(  # type: ignore
+        name="方式",
+        items=LIGHT_RIG_MODES,
+        default='SINGLE'
+    )
+    cluster_count: bpy.props.IntProperty(  # type: ignore
+        name="聚类数",
+        description="按聚类创建时的灯光组数量",
+        default=3,
+        min=1
+    )
+
     def execute(self, context):
         objs = context.selected_objects
 
@@ -273,132 +221,31 @@ class AddLightWithConstraint(bpy.types.Operator):
             self.report({'WARNING'}, f"无法切换模式: {e}")
             pass
 
-        # 计算选中对象的中心位置
-        loc = centro_global(objs)
-
-        # 保存当前活跃集合
-        original_active_collection = context.view_layer.active_layer_collection
-
-        # 设置 Scene Collection 为活跃集合
-        scene_collection = context.view_layer.layer_collection
-        context.view_layer.active_layer_collection = scene_collection
-
-        # 创建一个新的空对象
-        bpy.ops.object.add(type='EMPTY', location=loc)
-        empty_obj = context.object  # 获取新创建的空物体
-        empty_obj.name = "约束灯光组"  # 设置名称
-
-        # 在空对象的子级创建一个Spot灯光对象
-        bpy.ops.object.light_add(type='SPOT', location=loc)
-        light_obj = context.object  # 获取新创建的灯光对象
-        light_obj.parent = empty_obj  # 设置灯光对象的父级为空对象
-        light_obj.name = "约束灯光"  # 设置灯光名称
-        light_obj.location = (0, 0, 0)  # 将灯光对象位置归零
-
-        # 添加 Damped Track 约束到灯光对象
-        constraint = light_obj.constraints.new(type='DAMPED_TRACK')
-        constraint.target = empty_obj
-        constraint.track_axis = 'TRACK_NEGATIVE_Z'
-
-        # 恢复原来的活跃集合
-        context.view_layer.active_layer_collection = original_active_collection
-
-        # 设置新创建的灯光对象为活跃对象并选中
-        bpy.context.view_layer.objects.active = light_obj
-        bpy.ops.object.select_all(action='DESELECT')
-        light_obj.select_set(True)
-
-        self.report({'INFO'}, "灯光和约束已成功创建")
-        return {'FINISHED'}
-
-
-class SaveSelection(bpy.types.Operator):
-    bl_idname = "object.save_selection_visn"
-    bl_label = "保存【选择组】"
-    bl_description = "将当前选择的对象保存为序列，创建一个空对象：选择组"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        selected_objs = context.selected_objects
-        selection_data = []
-
-        # 收集当前选择的对象及其数据
-        for obj in selected_objs:
-            obj_data = {
-                'name': obj.name,
-                'type': obj.type,
-                'data': obj.data.name if obj.data else None
-            }
-            selection_data.append(obj_data)
-
-        # 生成选择组的名称
-        group_name_parts = [obj.name if len(
-            obj.name) <= 8 else obj.name[:8] + "..." for obj in selected_objs]
-        group_name = "选择组_" + ",".join(group_name_parts)
-
-        # 将选择的数据保存为JSON字符串
-        selection_json = json.dumps(selection_data, indent=4)
-
-        # 在SceneCollection下创建一个空对象叫做“选择组”
-        scene_collection = context.scene.collection
-        index = 1
-        base_name = group_name
-        while bpy.data.objects.get(f"{base_name}_{index}"):
-            index += 1
-        selection_group = bpy.data.objects.new(f"{base_name}_{index}", None)
-        scene_collection.objects.link(selection_group)
-
-        # 创建一个新的text block来存储选择数据
-        text_block_name = f"选择组数据_{index}"
-        text_block = bpy.data.texts.new(name=text_block_name)
-        text_block.write(selection_json)
-
-        # 将text block链接到选择组对象的自定义属性
-        selection_group["selection_data"] = text_block.name
-
-        self.report({'INFO'}, "当前选择已保存")
-        return {'FINISHED'}
-
-
-class LoadSelection(bpy.types.Operator):
-    bl_idname = "object.load_selection_visn"
-    bl_label = "读取【选择组】"
-    bl_description = "通过选择“选择组”对象，还原之前保存的选择状态"
-    bl_options = {"REGISTER", "UNDO"}
-
-    def execute(self, context):
-        active_obj = context.view_layer.objects.active
-        if not active_obj or not active_obj.name.startswith("选择组_"):
-            self.report({'WARNING'}, "请先选择一个“选择组”对象")
-            return {'CANCELLED'}
-
-        # 获取选择组对象的自定义属性中的text block名称
-        text_block_name = active_obj.get("selection_data")
-        if not text_block_name or text_block_name not in bpy.data.texts:
-            self.report({'WARNING'}, "未找到选择数据")
-            return {'CANCELLED'}
-
-        # 获取选择数据JSON字符串
-        selection_json = bpy.data.texts[text_block_name].as_string()
-        selection_data = json.loads(selection_json)
-
-        # 还原选择状态
-        bpy.ops.object.select_all(action='DESELECT')
-        for obj_data in selection_data:
-            obj = bpy.data.objects.get(obj_data['name'])
-            if obj:
-                obj.select_set(True)
-                context.view_layer.objects.active = obj
-
-        self.report({'INFO'}, "选择状态已还原")
+        # 计算目标点
+        if self.mode == 'CLUSTER':
+            targets = cluster_targets(objs, self.cluster_count, self.use_bounds)
+        else:
+            targets = rig_targets(objs, self.mode == 'PER_OBJECT', self.use_bounds)
+
+        # 所有灯光参数相同，共享同一个Spot灯光数据块；统一放在 Scene Collection 中
+        light_data = bpy.data.lights.new("约束灯光", 'SPOT')
+        rigs = [build_light_rig(context.scene.collection, target, light_data, update=False)
+                for target in targets]
+        context.view_layer.update()
+
+        # 选中新创建的灯光，最后一个设为活跃对象
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        for rig in rigs:
+            rig['light'].select_set(True)
+        context.view_layer.objects.active = rigs[-1]['light']
+
+        self.report({'INFO'}, f"灯光和约束已成功创建（{len(rigs)} 组）")
         return {'FINISHED'}
 
 
-# 使用Blender的属性系统来持久化存储状态
-bpy.types.Scene.children_select_state = bpy.props.BoolProperty(
-    name="Children Select State",
-    default=False
-)
+# 每个根物体自己记录封包状态（自定义属性），互不影响
+LOCK_PROP = "stool_children_locked"
 
 
 class ToggleChildrenSelectability(bpy.types.Operator):
@@ -407,40 +254,51 @@ class ToggleChildrenSelectability(bpy.types.Operator):
     bl_description = "将对象的子级内容全部可选性切换（开启或关闭）"
     bl_options = {'REGISTER', 'UNDO'}
 
+    @staticmethod
+    def is_locked(obj, descendants):
+        """旧文件没有记录状态时，子级全部不可选视为已封包"""
+        if LOCK_PROP in obj:
+            return bool(obj[LOCK_PROP])
+        return bool(descendants) and all(child.hide_select for child in descendants)
+
     def execute(self, context):
-        current_state = context.scene.children_select_state
         selected_objs = context.selected_objects.copy()  # 复制当前选择
+        hierarchy = HierarchyIndex()
 
-        # 递归设置所有子级的可选性
-        def set_children_selectability(obj, state):
-            for child in obj.children:
-                child.hide_select = state
-                set_children_selectability(child, state)
-
-        # 处理每个选中的对象
+        # 迭代遍历每个根的后代，先汇总目标状态，最后只写入实际变化的物体（跳过链接的物体）
+        targets = {}
+        unlocked = []
+        locked_count = 0
         for obj in selected_objs:
-            set_children_selectability(obj, not current_state)
-
-        # 切换并存储新状态
-        context.scene.children_select_state = not current_state
-
-        if current_state:
+            descendants = hierarchy.descendants(obj)
+            lock = not self.is_locked(obj, descendants)
+            for child in descendants:
+                targets[child] = lock
+            obj[LOCK_PROP] = lock
+            if lock:
+                locked_count += 1
+            else:
+                unlocked.append(descendants)
+
+        for child, lock in targets.items():
+            if child.hide_select != lock and not child.library:
+                child.hide_select = lock
+        context.view_layer.update()
+
+        # 解包的对象重新选中它的整个层级
+        if unlocked:
             bpy.ops.object.select_all(action='DESELECT')
             for obj in selected_objs:
                 obj.select_set(True)
-                self.select_hierarchy(obj)
+            for descendants in unlocked:
+                for child in descendants:
+                    child.select_set(True)
 
         # 操作反馈
-        state = "关闭" if current_state else "开启"
-        self.report({'INFO'}, f"子级选择性已{state}")
+        self.report({'INFO'}, f"封包 {locked_count} 个，解包 {len(unlocked)} 个对象的子级")
 
         # 刷新界面
-        context.area.tag_redraw()
+        if context.area:
+            context.area.tag_redraw()
 
         return {'FINISHED'}
-
-    def select_hierarchy(self, obj):
-        """递归选择对象及其所有子级"""
-        for child in obj.children:
-            child.select_set(True)
-            self.select_hierarchy(child)
@@ -0,0 +1,255 @@
+import os
+import csv
+from concurrent.futures import ThreadPoolExecutor
+import bpy  # type: ignore
+from bpy.props import (StringProperty, IntProperty,  # type: ignore
+                       FloatProperty, EnumProperty)
+from bpy.types import Operator, PropertyGroup, UIList  # type: ignore
+from .ImageHeaders import read_image_header, read_image_header_bytes  # type: ignore
+from .TextureIndex import ensure_index, owner_images, object_materials  # type: ignore
+
+# --------------------------
+# 贴图内存审计：线程池读取文件头（不加载像素），估算每张贴图及每个材质/物体的内存
+# --------------------------
+
+MB = 1024.0 * 1024.0
+# 材质/物体只保留最重的前N项，避免十万级物体撑爆列表
+MAX_OWNER_ROWS = 200
+# 打包图片只取前1MB解析文件头
+PACKED_HEADER_BYTES = 1024 * 1024
+
+AUDIT_KINDS = [
+    ('IMAGE', "贴图", "按贴图查看"),
+    ('MATERIAL', "材质", "按材质查看（材质内所有贴图之和）"),
+    ('OBJECT', "物体", "按物体查看（物体所有材质贴图之和）"),
+]
+
+AUDIT_SORTS = [
+    ('GPU', "显存", "按估算显存排序"),
+    ('RAM', "内存", "按估算内存排序"),
+    ('FILE', "文件大小", "按磁盘文件大小排序"),
+    ('NAME', "名称", "按名称排序"),
+]
+
+
+class TextureAuditItem(PropertyGroup):
+    kind: EnumProperty(items=AUDIT_KINDS, default='IMAGE')  # type: ignore
+    width: IntProperty()  # type: ignore
+    height: IntProperty()  # type: ignore
+    channels: IntProperty()  # type: ignore
+    bit_depth: IntProperty()  # type: ignore
+    image_count: IntProperty()  # type: ignore
+    file_mb: FloatProperty()  # type: ignore
+    ram_mb: FloatProperty()  # type: ignore
+    gpu_mb: FloatProperty()  # type: ignore
+    filepath: StringProperty()  # type: ignore
+
+
+def image_abspath(image):
+    """贴图的绝对文件路径；UDIM返回第一块的路径"""
+    path = bpy.path.abspath(image.filepath, library=image.library)
+    if image.source == 'TILED' and image.tiles:
+        path = path.replace('<UDIM>', str(image.tiles[0].number))
+    return os.path.normpath(path) if path else ""
+
+
+def estimate_cost(info, tiles=1):
+    """按Blender的存储方式估算 (内存, 显存) 字节数：
+    8位图片存为RGBA byte，高位深/浮点图片存为RGBA float；显存按half float + mipmap估算"""
+    pixels = info['width'] * info['height'] * tiles
+    high = info['is_float'] or info['bit_depth'] > 8
+    ram = pixels * (16 if high else 4)
+    gpu = pixels * (8 if high else 4) * 4 // 3
+    return ram, gpu
+
+
+def image_cost(image):
+    """单张贴图的 (内存, 显存) 估算；已加载的直接用Blender中的尺寸，否则只读文件头"""
+    tiles = len(image.tiles) if image.source == 'TILED' else 1
+    if image.has_data:
+        width, height = image.size
+        info = {'width': width, 'height': height, 'bit_depth': 8, 'is_float': image.is_float}
+    elif image.packed_file:
+        info = read_image_header_bytes(image.packed_file.data[:PACKED_HEADER_BYTES], image.filepath)
+    else:
+        info = read_image_header(image_abspath(image))
+    return estimate_cost(info, tiles) if info else (0, 0)
+
+
+def _read_file(path):
+    """线程中执行：文件头 + 文件大小"""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None, 0
+    return read_image_header(path), size
+
+
+def audit_images():
+    """返回 {贴图名: 信息dict}，信息包含尺寸、通道、位深、文件大小、内存/显存估算"""
+    jobs = {}
+    results = {}
+    for image in bpy.data.images:
+        if image.type not in ('IMAGE', 'MULTILAYER') or image.source not in ('FILE', 'SEQUENCE', 'TILED'):
+            continue
+        tiles = len(image.tiles) if image.source == 'TILED' else 1
+        if image.packed_file:
+            info = read_image_header_bytes(
+                image.packed_file.data[:PACKED_HEADER_BYTES], image.filepath)
+            results[image.name] = (info, image.packed_file.size, tiles, "<packed>")
+        else:
+            jobs[image.name] = (image_abspath(image), tiles)
+
+    # bpy只能在主线程访问，线程池里只做文件读取
+    names = list(jobs)
+    with ThreadPoolExecutor() as executor:
+        for name, (info, size) in zip(names, executor.map(_read_file, [jobs[n][0] for n in names])):
+            results[name] = (info, size, jobs[name][1], jobs[name][0])
+
+    audit = {}
+    for name, (info, size, tiles, path) in results.items():
+        image = bpy.data.images[name]
+        if info is None and image.has_data:
+            # 文件读不到但已加载到内存（例如生成的图片），直接用Blender中的信息
+            width, height = image.size
+            info = {'width': width, 'height': height, 'channels': image.channels,
+                    'bit_depth': image.depth // max(image.channels, 1),
+                    'is_float': image.is_float}
+        if info is None:
+            continue
+        ram, gpu = estimate_cost(info, tiles)
+        audit[name] = dict(info, file_size=size, ram=ram, gpu=gpu, filepath=path)
+    return audit
+
+
+def aggregate_owner_costs(audit):
+    """按材质、物体汇总贴图开销，返回 (材质列表, 物体列表)，元素为 (名称, 贴图数, 内存, 显存)"""
+    ensure_index()
+
+    def total(images):
+        known = [audit[name] for name in images if name in audit]
+        return (len(known), sum(i['ram'] for i in known), sum(i['gpu'] for i in known))
+
+    materials = [(name, *total(images))
+                 for (kind, name), images in owner_images.items() if kind == 'MATERIAL']
+    objects = []
+    for obj_name, mat_names in object_materials.items():
+        images = set(owner_images.get(('OBJECT', obj_name), ()))
+        for mat_name in mat_names:
+            images |= owner_images.get(('MATERIAL', mat_name), set())
+        objects.append((obj_name, *total(images)))
+    for kind, name in owner_images:
+        if kind == 'OBJECT' and name not in object_materials:
+            objects.append((name, *total(owner_images[(kind, name)])))
+
+    def top(rows):
+        return sorted(rows, key=lambda r: r[3], reverse=True)[:MAX_OWNER_ROWS]
+    return top(materials), top(objects)
+
+
+class INDEX_OT_texture_audit(Operator):
+    bl_idname = "index.texture_audit"
+    bl_label = "贴图内存审计"
+    bl_description = "读取所有贴图文件头（不加载像素），估算每张贴图、每个材质/物体的内存和显存占用"
+
+    def execute(self, context):
+        props = context.scene.texture_search_props
+        audit = audit_images()
+        materials, objects = aggregate_owner_costs(audit)
+
+        items = props.audit_items
+        items.clear()
+        for name, info in audit.items():
+            item = items.add()
+            item.name = name
+            item.kind = 'IMAGE'
+            item.width = info['width']
+            item.height = info['height']
+            item.channels = info['channels']
+            item.bit_depth = info['bit_depth']
+            item.image_count = 1
+            item.file_mb = info['file_size'] / MB
+            item.ram_mb = info['ram'] / MB
+            item.gpu_mb = info['gpu'] / MB
+            item.filepath = info['filepath']
+        for kind, rows in (('MATERIAL', materials), ('OBJECT', objects)):
+            for name, count, ram, gpu in rows:
+                item = items.add()
+                item.name = name
+                item.kind = kind
+                item.image_count = count
+                item.ram_mb = ram / MB
+                item.gpu_mb = gpu / MB
+
+        total_gpu = sum(info['gpu'] for info in audit.values()) / MB
+        self.report({'INFO'}, f"审计完成：{len(audit)} 张贴图，估算显存共 {total_gpu:.0f} MB")
+        return {'FINISHED'}
+
+
+class INDEX_OT_export_texture_audit(Operator):
+    bl_idname = "index.export_texture_audit"
+    bl_label = "导出审计CSV"
+    bl_description = "将贴图内存审计结果导出为CSV"
+
+    filepath: StringProperty(subtype='FILE_PATH')  # type: ignore
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = bpy.path.abspath("//texture_audit.csv") if bpy.data.filepath else "texture_audit.csv"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        items = context.scene.texture_search_props.audit_items
+        if not items:
+            self.report({'WARNING'}, "请先进行贴图内存审计!")
+            return {'CANCELLED'}
+
+        try:
+            with open(self.filepath, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['kind', 'name', 'width', 'height', 'channels', 'bit_depth',
+                                 'image_count', 'file_mb', 'ram_mb', 'gpu_mb', 'filepath'])
+                for item in sorted(items, key=lambda i: (i.kind, -i.gpu_mb)):
+                    writer.writerow([item.kind, item.name, item.width, item.height, item.channels,
+                                     item.bit_depth, item.image_count, round(item.file_mb, 3),
+                                     round(item.ram_mb, 3), round(item.gpu_mb, 3), item.filepath])
+        except OSError as e:
+            self.report({'ERROR'}, f"无法写入CSV: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"已导出审计结果: {self.filepath}")
+        return {'FINISHED'}
+
+
+class INDEX_UL_texture_audit(UIList):
+    """审计结果列表：按当前视图类型过滤，按选择的字段排序"""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        if item.kind == 'IMAGE':
+            row.label(text=item.name, icon='IMAGE_DATA')
+            row.label(text=f"{item.width}x{item.height}")
+        else:
+            row.label(text=item.name, icon='MATERIAL' if item.kind == 'MATERIAL' else 'OBJECT_DATA')
+            row.label(text=f"{item.image_count} 张")
+        row.label(text=f"{item.gpu_mb:.1f} MB")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        view = data.audit_view
+        flags = [self.bitflag_filter_item if item.kind == view else 0 for item in items]
+
+        sort = data.audit_sort
+        if sort == 'NAME':
+            keys = [item.name.lower() for item in items]
+            order = sorted(range(len(items)), key=lambda i: keys[i])
+        else:
+            attr = {'GPU': 'gpu_mb', 'RAM': 'ram_mb', 'FILE': 'file_mb'}[sort]
+            values = [getattr(item, attr) for item in items]
+            order = sorted(range(len(items)), key=lambda i: values[i], reverse=True)
+        # flt_neworder[原索引] = 新位置
+        new_order = [0] * len(items)
+        for position, index in enumerate(order):
+            new_order[index] = position
+        return flags, new_order
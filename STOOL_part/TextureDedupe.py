@@ -0,0 +1,158 @@
+import os
+import re
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import bpy  # type: ignore
+from bpy.props import BoolProperty  # type: ignore
+from bpy.types import Operator  # type: ignore
+from .TextureAudit import image_abspath, image_cost, MB  # type: ignore
+from .TextureIndex import invalidate as invalidate_texture_index  # type: ignore
+
+try:
+    import xxhash  # type: ignore  # 可选依赖，Blender默认不带
+except ImportError:
+    xxhash = None
+
+# --------------------------
+# 重复贴图检测：文件大小预筛 -> 线程池分块哈希 -> 按内容+色彩设置分组 -> user_remap合并
+# --------------------------
+
+HASH_CHUNK = 1024 * 1024
+
+_NUMBER_SUFFIX = re.compile(r"\.\d{3}$")
+
+
+def _new_hasher():
+    return xxhash.xxh3_128() if xxhash else hashlib.blake2b(digest_size=20)
+
+
+def file_hash(path):
+    """分块读取文件计算内容哈希；读取失败返回None（线程中执行）"""
+    hasher = _new_hasher()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+
+def _image_key(image):
+    """只有色彩空间、alpha模式也一致的贴图才能合并"""
+    return (image.source, image.colorspace_settings.name, image.alpha_mode)
+
+
+def find_duplicate_groups():
+    """返回重复贴图分组列表，每组为 [保留的贴图名, 重复的贴图名...]"""
+    by_size = {}
+    packed_hashes = {}
+    for image in bpy.data.images:
+        # UDIM只能读到第一块，不参与合并
+        if image.source != 'FILE' or image.type not in ('IMAGE', 'MULTILAYER'):
+            continue
+        if image.packed_file:
+            hasher = _new_hasher()
+            hasher.update(image.packed_file.data)
+            packed_hashes[image.name] = hasher.hexdigest()
+            by_size.setdefault(('packed', image.packed_file.size), []).append(image.name)
+            continue
+        path = image_abspath(image)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        by_size.setdefault(('file', size), []).append(image.name)
+
+    # 只有同大小的贴图才需要哈希，同一路径只算一次
+    candidates = [names for names in by_size.values() if len(names) > 1]
+    paths = {}
+    for names in candidates:
+        for name in names:
+            if name not in packed_hashes:
+                paths[name] = image_abspath(bpy.data.images[name])
+    unique_paths = sorted(set(paths.values()))
+    with ThreadPoolExecutor() as executor:
+        path_hashes = dict(zip(unique_paths, executor.map(file_hash, unique_paths)))
+
+    groups = {}
+    for names in candidates:
+        for name in names:
+            digest = packed_hashes.get(name) or path_hashes.get(paths.get(name))
+            if digest is None:
+                continue
+            image = bpy.data.images[name]
+            groups.setdefault((digest,) + _image_key(image), []).append(name)
+
+    result = []
+    for names in groups.values():
+        if len(names) < 2:
+            continue
+        names.sort(key=_keep_priority)
+        result.append(names)
+    return result
+
+
+def _keep_priority(name):
+    """优先保留：使用者多、没有.001后缀、名称短的贴图"""
+    image = bpy.data.images[name]
+    return (-image.users, bool(_NUMBER_SUFFIX.search(name)), len(name), name)
+
+
+def merge_duplicate_groups(groups, remove=True):
+    """把每组重复贴图的所有引用重定向到保留的贴图，可选删除重复数据块"""
+    removed = []
+    for keep_name, *dup_names in groups:
+        keep = bpy.data.images[keep_name]
+        for name in dup_names:
+            dup = bpy.data.images[name]
+            dup.user_remap(keep)
+            removed.append(dup)
+    if remove and removed:
+        bpy.data.batch_remove(removed)
+    invalidate_texture_index()
+    return len(removed)
+
+
+class INDEX_OT_deduplicate_images(Operator):
+    bl_idname = "index.deduplicate_images"
+    bl_label = "合并重复贴图"
+    bl_description = "按文件内容查找重复的贴图，把所有节点引用合并到同一个数据块"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: BoolProperty(  # type: ignore
+        name="仅预览",
+        description="只输出重复分组报告，不做修改",
+        default=True
+    )
+    remove_duplicates: BoolProperty(  # type: ignore
+        name="删除重复数据块",
+        description="合并后删除不再使用的重复贴图",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+    def execute(self, context):
+        groups = find_duplicate_groups()
+        if not groups:
+            self.report({'INFO'}, "没有发现重复贴图")
+            return {'FINISHED'}
+
+        saved_gpu = 0
+        print("\n重复贴图分组:")
+        for keep_name, *dup_names in groups:
+            _, gpu = image_cost(bpy.data.images[keep_name])
+            saved_gpu += gpu * len(dup_names)
+            print(f"- 保留 {keep_name}  <-  {', '.join(dup_names)}")
+        duplicate_count = sum(len(g) - 1 for g in groups)
+
+        if self.dry_run:
+            self.report({'INFO'}, f"[预览] {len(groups)} 组共 {duplicate_count} 张重复贴图，"
+                        f"可节省显存约 {saved_gpu / MB:.0f} MB（详见控制台）")
+            return {'FINISHED'}
+
+        merged = merge_duplicate_groups(groups, self.remove_duplicates)
+        self.report({'INFO'}, f"已合并 {merged} 张重复贴图，节省显存约 {saved_gpu / MB:.0f} MB")
+        return {'FINISHED'}
@@ -0,0 +1,490 @@
+import json
+import hashlib
+import bpy  # type: ignore
+from bpy.app.handlers import persistent  # type: ignore
+
+# --------------------------
+# 贴图索引：首次使用时全量建立，之后由depsgraph_update_post增量维护（数据块增删时只处理增删的部分）
+# 所有者(owner)为 (类型, 名称)，类型：MATERIAL / WORLD / LIGHT / OBJECT（几何节点修改器）
+# 节点组递归扫描，每个节点组的贴图集合只计算一次（memo）
+# 保存工程时索引连同每个节点树的签名写入文本块，打开工程后签名未变的所有者/节点组直接复用，
+# 只重新扫描变化的部分；签名为各节点引用的贴图和节点组，在扫描时顺便计算，不额外遍历
+# --------------------------
+
+TEXT_BLOCK_NAME = ".stool_texture_index"
+INDEX_VERSION = 3
+
+# 所有者 -> 该所有者使用的贴图名集合
+owner_images = {}
+# 贴图名 -> 使用该贴图的所有者集合（由owner_images反推）
+image_owners = {}
+# 内嵌节点树指针 -> 所有者（节点树的更新需要找回所属材质/世界/灯光）
+_tree_owner = {}
+# 节点组名 -> (贴图名集合, 递归用到的节点组名集合)
+_group_memo = {}
+# 所有者 -> 递归用到的节点组名集合
+_owner_groups = {}
+# 节点组名 -> 直接或间接使用它的所有者集合
+_group_users = {}
+# 物体名 -> 材质槽中的材质名集合
+object_materials = {}
+# 材质名 -> 使用该材质的物体名集合（由object_materials反推）
+material_objects = {}
+# 已建立索引的所有者（包括没有用到贴图的） -> 节点树签名
+_owner_sig = {}
+# 节点组名 -> 节点树签名
+_group_sig = {}
+
+# generation 每次重建或载入时加一，供搜索索引等派生数据判断是否过期
+_state = {'built': False, 'counts': None, 'generation': 0}
+
+OWNER_SOURCES = {
+    'MATERIAL': lambda: bpy.data.materials,
+    'WORLD': lambda: bpy.data.worlds,
+    'LIGHT': lambda: bpy.data.lights,
+    'OBJECT': lambda: bpy.data.objects,
+}
+
+
+def _datablock_counts():
+    data = bpy.data
+    return (len(data.materials), len(data.worlds), len(data.lights), len(data.node_groups))
+
+
+def _node_refs(node, scan_sockets):
+    """节点直接引用的贴图和节点组：(节点名, 引用类型或插槽, 数据块名)"""
+    image = getattr(node, 'image', None)  # 图像纹理/环境纹理/几何节点图像输入
+    if image:
+        yield node.name, 'IMAGE', image.name
+    if node.type == 'GROUP' and node.node_tree:
+        yield node.name, 'GROUP', node.node_tree.name
+    if scan_sockets:
+        for socket in node.inputs:
+            if socket.type == 'IMAGE' and not socket.is_linked and socket.default_value:
+                yield node.name, socket.identifier, socket.default_value.name
+
+
+def _signature(refs):
+    return hashlib.blake2b(repr(sorted(refs)).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def tree_signature(tree):
+    """节点树签名：每个节点引用的贴图/节点组；不递归，嵌套节点组由它自己的签名校验"""
+    scan_sockets = tree.bl_idname == 'GeometryNodeTree'
+    return _signature([ref for node in tree.nodes for ref in _node_refs(node, scan_sockets)])
+
+
+def owner_signature(id_data):
+    tree = getattr(id_data, 'node_tree', None)
+    if not tree or not getattr(id_data, 'use_nodes', True):
+        return ""
+    return tree_signature(tree)
+
+
+def _scan_nodes(tree, images, groups, visiting):
+    """扫描节点树，贴图名写入images，递归用到的节点组写入groups；返回节点树签名"""
+    scan_sockets = tree.bl_idname == 'GeometryNodeTree'
+    refs = []
+    for node in tree.nodes:
+        for ref in _node_refs(node, scan_sockets):
+            refs.append(ref)
+            if ref[1] != 'GROUP':
+                images.add(ref[2])
+                continue
+            group_images, group_groups = _group_image_set(node.node_tree, visiting)
+            images |= group_images
+            groups.add(ref[2])
+            groups |= group_groups
+    return _signature(refs)
+
+
+def _group_image_set(group, visiting=None):
+    """节点组的贴图集合（带memo，共享节点组只扫描一次）"""
+    memo = _group_memo.get(group.name)
+    if memo is not None:
+        return memo
+    if visiting is None:
+        visiting = set()
+    if group.name in visiting:
+        return set(), set()  # 防止循环引用
+    visiting.add(group.name)
+    images, groups = set(), set()
+    signature = _scan_nodes(group, images, groups, visiting)
+    visiting.discard(group.name)
+    _group_memo[group.name] = (images, groups)
+    _group_sig[group.name] = signature
+    return images, groups
+
+
+def _modifier_images(obj, images, groups):
+    """几何节点修改器：节点组内部贴图 + 修改器面板上的图像输入"""
+    for mod in obj.modifiers:
+        if mod.type != 'NODES' or not mod.node_group:
+            continue
+        group_images, group_groups = _group_image_set(mod.node_group)
+        images |= group_images
+        groups.add(mod.node_group.name)
+        groups |= group_groups
+        try:
+            items = mod.node_group.interface.items_tree
+        except AttributeError:
+            continue
+        for item in items:
+            if getattr(item, 'socket_type', None) == 'NodeSocketImage' and item.in_out == 'INPUT':
+                image = mod.get(item.identifier)
+                if isinstance(image, bpy.types.Image):
+                    images.add(image.name)
+
+
+def scan_owner(kind, id_data):
+    """返回所有者使用的 (贴图名集合, 节点组名集合, 节点树签名)"""
+    images, groups = set(), set()
+    if kind == 'OBJECT':
+        _modifier_images(id_data, images, groups)
+        return images, groups, ""
+    signature = ""
+    tree = getattr(id_data, 'node_tree', None)
+    if tree and getattr(id_data, 'use_nodes', True):
+        signature = _scan_nodes(tree, images, groups, set())
+    return images, groups, signature
+
+
+def scan_material(mat):
+    """返回材质使用的贴图名集合（包含节点组内部）"""
+    return scan_owner('MATERIAL', mat)[0]
+
+
+def _drop_owner(key):
+    for image_name in owner_images.pop(key, ()):
+        users = image_owners.get(image_name)
+        if users is not None:
+            users.discard(key)
+            if not users:
+                del image_owners[image_name]
+    for group_name in _owner_groups.pop(key, ()):
+        users = _group_users.get(group_name)
+        if users is not None:
+            users.discard(key)
+
+
+def _index_owner(kind, id_data):
+    _store_owner(kind, id_data, *scan_owner(kind, id_data))
+
+
+def _store_owner(kind, id_data, images, groups, signature=""):
+    """signature 由扫描或载入时的校验得到，这里不再计算"""
+    key = (kind, id_data.name)
+    _drop_owner(key)
+    tree = getattr(id_data, 'node_tree', None)
+    if tree:
+        _tree_owner[tree.as_pointer()] = key
+    if kind != 'OBJECT':
+        _owner_sig[key] = signature
+    if groups:
+        _owner_groups[key] = groups
+        for group_name in groups:
+            _group_users.setdefault(group_name, set()).add(key)
+    if not images:
+        return
+    owner_images[key] = images
+    for image_name in images:
+        image_owners.setdefault(image_name, set()).add(key)
+
+
+def _drop_object_materials(obj_name):
+    for mat_name in object_materials.pop(obj_name, ()):
+        users = material_objects.get(mat_name)
+        if users is not None:
+            users.discard(obj_name)
+            if not users:
+                del material_objects[mat_name]
+
+
+def _index_object_materials(obj):
+    _drop_object_materials(obj.name)
+    mats = {slot.material.name for slot in obj.material_slots if slot.material}
+    if not mats:
+        return
+    object_materials[obj.name] = mats
+    for mat_name in mats:
+        material_objects.setdefault(mat_name, set()).add(obj.name)
+
+
+def _index_object(obj):
+    """物体：材质槽 + 几何节点修改器"""
+    _index_object_materials(obj)
+    if obj.modifiers or ('OBJECT', obj.name) in owner_images:
+        _index_owner('OBJECT', obj)
+
+
+def _clear():
+    for container in (owner_images, image_owners, _tree_owner, _group_memo,
+                      _owner_groups, _group_users, object_materials, material_objects,
+                      _owner_sig, _group_sig):
+        container.clear()
+
+
+def build_full_index():
+    """全量重建索引（物体的材质槽在同一遍中建立）"""
+    _clear()
+    for kind, source in OWNER_SOURCES.items():
+        for id_data in source():
+            if kind == 'OBJECT':
+                _index_object(id_data)
+            else:
+                _index_owner(kind, id_data)
+    _state['built'] = True
+    _state['counts'] = _datablock_counts()
+    _state['generation'] += 1
+
+
+def serialize_index():
+    """节点树部分的索引（物体材质槽读取很快，不保存）"""
+    groups = {name: [_group_sig.get(name, ""), sorted(images), sorted(nested)]
+              for name, (images, nested) in _group_memo.items()}
+    owners = [[kind, name, signature,
+               sorted(owner_images.get((kind, name), ())),
+               sorted(_owner_groups.get((kind, name), ()))]
+              for (kind, name), signature in _owner_sig.items() if _owner_exists((kind, name))]
+    return {'version': INDEX_VERSION, 'groups': groups, 'owners': owners}
+
+
+def rebuild_stale(data):
+    """按保存的索引重建：签名未变的节点组/所有者直接复用，其余重新扫描；返回复用的所有者数"""
+    stored_groups = data.get('groups', {})
+    node_groups = bpy.data.node_groups
+    valid = {name for name, (signature, _, _) in stored_groups.items()
+             if name in node_groups and tree_signature(node_groups[name]) == signature}
+    # 嵌套的节点组失效，外层节点组也失效
+    changed = True
+    while changed:
+        changed = False
+        for name in list(valid):
+            if any(nested not in valid for nested in stored_groups[name][2]):
+                valid.discard(name)
+                changed = True
+
+    _clear()
+    for name in valid:
+        signature, images, nested = stored_groups[name]
+        _group_memo[name] = (set(images), set(nested))
+        _group_sig[name] = signature
+
+    for kind, name, signature, images, groups in data.get('owners', []):
+        source = OWNER_SOURCES.get(kind)
+        id_data = source().get(name) if source and kind != 'OBJECT' else None
+        if (id_data and owner_signature(id_data) == signature
+                and all(group in valid for group in groups)):
+            _store_owner(kind, id_data, set(images), set(groups), signature)
+
+    reused = len(_owner_sig)
+    for kind, source in OWNER_SOURCES.items():
+        for id_data in source():
+            if kind == 'OBJECT':
+                _index_object(id_data)
+            elif (kind, id_data.name) not in _owner_sig:
+                _index_owner(kind, id_data)
+    _state['built'] = True
+    _state['counts'] = _datablock_counts()
+    _state['generation'] += 1
+    return reused
+
+
+def _read_text_block():
+    text = bpy.data.texts.get(TEXT_BLOCK_NAME)
+    if not text:
+        return None
+    try:
+        data = json.loads(text.as_string())
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+        return None
+    return data
+
+
+def save_to_blend():
+    """把索引写入工程内的文本块"""
+    text = bpy.data.texts.get(TEXT_BLOCK_NAME) or bpy.data.texts.new(TEXT_BLOCK_NAME)
+    text.from_string(json.dumps(serialize_index(), ensure_ascii=False, separators=(',', ':')))
+
+
+def invalidate():
+    """标记索引失效，下次查询时重建（签名未变的部分复用工程内保存的索引）"""
+    _state['built'] = False
+
+
+def ensure_index():
+    """查询前调用：索引未建立时建立；数据块数量变化（新增/删除）时只处理增删的部分"""
+    if _state['built']:
+        if _state['counts'] != _datablock_counts():
+            sync_index()
+        return
+    data = _read_text_block()
+    if data:
+        rebuild_stale(data)
+    else:
+        build_full_index()
+
+
+def _owner_exists(key):
+    kind, name = key
+    return name in OWNER_SOURCES[kind]()
+
+
+def get_image_owners(image_name):
+    """返回使用该贴图的所有者列表 [(类型, 名称)]（已排序）"""
+    ensure_index()
+    owners = image_owners.get(image_name, set())
+    if not all(_owner_exists(key) for key in owners):
+        # 所有者被改名或删除，索引中的名称已过期
+        build_full_index()
+        owners = image_owners.get(image_name, set())
+    return sorted(owners)
+
+
+def get_image_materials(image_name):
+    """返回使用该贴图的材质名列表（已排序）"""
+    return [name for kind, name in get_image_owners(image_name) if kind == 'MATERIAL']
+
+
+def get_material_objects(material_name):
+    """返回使用该材质的物体名集合"""
+    ensure_index()
+    return material_objects.get(material_name, set())
+
+
+def get_image_objects(image_name):
+    """返回使用该贴图的物体名集合：经由材质槽，或几何节点修改器"""
+    objects = set()
+    for kind, name in get_image_owners(image_name):
+        if kind == 'MATERIAL':
+            objects |= material_objects.get(name, set())
+        elif kind == 'OBJECT':
+            objects.add(name)
+    return objects
+
+
+def index_built():
+    return _state['built']
+
+
+def index_generation():
+    return _state['generation']
+
+
+def indexed_image_count():
+    ensure_index()
+    return len(image_owners)
+
+
+def _invalidate_group(group_name, changed):
+    """节点组变化：清除它及所有包含它的节点组的memo，并收集受影响的所有者"""
+    _group_memo.pop(group_name, None)
+    for name, (_, groups) in list(_group_memo.items()):
+        if group_name in groups:
+            del _group_memo[name]
+    for key in _group_users.get(group_name, ()):
+        changed.add(key)
+
+
+def _reindex(keys):
+    for kind, name in keys:
+        id_data = OWNER_SOURCES[kind]().get(name)
+        if not id_data:
+            continue
+        if kind == 'OBJECT':
+            _index_object(id_data)
+        else:
+            _index_owner(kind, id_data)
+
+
+def sync_index():
+    """数据块有增删时：移除已不存在的所有者和节点组，只扫描新增的所有者和受删除节点组影响的所有者"""
+    changed = set()
+    node_groups = bpy.data.node_groups
+    for name in [name for name in _group_memo if name not in node_groups]:
+        _invalidate_group(name, changed)
+    for key in [key for key in _owner_sig if not _owner_exists(key)]:
+        _drop_owner(key)
+        del _owner_sig[key]
+    for kind, source in OWNER_SOURCES.items():
+        if kind == 'OBJECT':
+            continue
+        for id_data in source():
+            key = (kind, id_data.name)
+            if key not in _owner_sig:
+                changed.add(key)
+    _reindex(changed)
+    _state['counts'] = _datablock_counts()
+    _state['generation'] += 1
+
+
+def _owner_kind(id_data):
+    if isinstance(id_data, bpy.types.Material):
+        return 'MATERIAL'
+    if isinstance(id_data, bpy.types.World):
+        return 'WORLD'
+    if isinstance(id_data, bpy.types.Light):
+        return 'LIGHT'
+    if isinstance(id_data, bpy.types.Object):
+        return 'OBJECT'
+    return None
+
+
+@persistent
+def on_depsgraph_update_post(scene, depsgraph):
+    if not _state['built']:
+        return  # 尚未使用过索引，不做任何事
+    if _state['counts'] != _datablock_counts():
+        sync_index()
+
+    changed = set()
+    for update in depsgraph.updates:
+        id_data = update.id.original
+        kind = _owner_kind(id_data)
+        if kind:
+            changed.add((kind, id_data.name))
+        elif isinstance(id_data, bpy.types.NodeTree):
+            owner = _tree_owner.get(id_data.as_pointer())
+            if owner:
+                changed.add(owner)
+            elif id_data.name in bpy.data.node_groups:
+                _invalidate_group(id_data.name, changed)
+
+    _reindex(changed)
+
+
+@persistent
+def on_invalidate(*args):
+    invalidate()
+
+
+@persistent
+def on_save_pre(*args):
+    # 本次会话没有用到索引但工程里有旧的文本块时，同样先按签名更新再写回，不保存过期数据
+    if _state['built'] or bpy.data.texts.get(TEXT_BLOCK_NAME):
+        ensure_index()  # 数据块有增删时先同步
+        save_to_blend()
+
+
+_handlers = [
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update_post),
+    (bpy.app.handlers.save_pre, on_save_pre),
+    (bpy.app.handlers.load_post, on_invalidate),
+    (bpy.app.handlers.undo_post, on_invalidate),
+    (bpy.app.handlers.redo_post, on_invalidate),
+]
+
+
+def register_handlers():
+    for handler_list, func in _handlers:
+        if func not in handler_list:
+            handler_list.append(func)
+
+
+def unregister_handlers():
+    for handler_list, func in _handlers:
+        if func in handler_list:
+            handler_list.remove(func)
+    invalidate()
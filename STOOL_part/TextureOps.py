@@ -1,6 +1,11 @@
 import bpy
-from bpy.props import StringProperty  # type: ignore
+from bpy.props import (StringProperty, IntProperty,  # type: ignore
+                       BoolProperty, EnumProperty, CollectionProperty)
 from bpy.types import Operator, PropertyGroup  # type: ignore
+from .TextureAudit import TextureAuditItem, AUDIT_KINDS, AUDIT_SORTS  # type: ignore
+from .TextureProxy import PROXY_PREV_LEVELS  # type: ignore
+from .TextureSearch import TextureSearchResult, SEARCH_KINDS, update_search  # type: ignore
+from .TextureIndex import build_full_index, get_image_objects, get_image_owners, image_owners  # type: ignore
 
 
 class INDEX_OT_select_objects_with_texture(Operator):
@@ -11,39 +16,28 @@ class INDEX_OT_select_objects_with_texture(Operator):
     def execute(self, context):
         props = context.scene.texture_search_props
         selected_image = props.texture_search_image
-        global texture_material_index
-
-        if not texture_material_index:
-            self.report({'WARNING'}, "请先建立贴图索引!")
-            return {'CANCELLED'}
 
         if not selected_image:
             self.report({'WARNING'}, "请选择一张贴图!")
             return {'CANCELLED'}
 
-        if selected_image not in texture_material_index:
-            self.report({'INFO'}, f"贴图 '{selected_image}' 未被任何材质使用")
+        # 索引中直接取出使用该贴图的物体名（材质槽 + 几何节点）
+        object_names = get_image_objects(selected_image)
+        if not object_names:
+            self.report({'INFO'}, f"贴图 '{selected_image}' 未被任何物体使用")
             return {'FINISHED'}
 
         # 取消所有当前选择
         bpy.ops.object.select_all(action='DESELECT')
 
-        # 获取使用该贴图的材质列表
-        material_names = texture_material_index[selected_image]
+        # 只选择活跃视图层中的物体（其他场景/排除的集合无法被选中）
+        layer_objects = context.view_layer.objects
         selected_count = 0
-
-        # 遍历所有对象
-        try:
-            for obj in bpy.data.objects:
-                if hasattr(obj.data, 'materials'):
-                    for mat_slot in obj.material_slots:
-                        if mat_slot.material and mat_slot.material.name in material_names:
-                            obj.select_set(True)
-                            selected_count += 1
-                            break  # 如果物体有多个材质，找到一个匹配的就可以停止
-        except Exception as e:
-            self.report({'ERROR'}, f"发生错误: 物体可能不在当前场景中 {str(e)}")
-            return {'CANCELLED'}
+        for name in object_names:
+            obj = layer_objects.get(name)
+            if obj:
+                obj.select_set(True)
+                selected_count += 1
 
         self.report({'INFO'}, f"已选中 {selected_count} 个使用该贴图的物体")
         return {'FINISHED'}
@@ -55,71 +49,120 @@ class TextureSearchProperties(PropertyGroup):
         description="选择要查找的贴图",
         default=""
     )  # type: ignore
-
-
-# 全局变量存储索引结果
-texture_material_index = {}
+    relink_roots: StringProperty(
+        name="搜索目录",
+        description="查找丢失贴图的目录，多个目录用 ; 分隔",
+        default=""
+    )  # type: ignore
+    proxy_dir: StringProperty(
+        name="代理目录",
+        description="代理贴图缓存目录",
+        subtype='DIR_PATH',
+        default="//__TexProxy__/"
+    )  # type: ignore
+    proxy_prev_level: EnumProperty(
+        name="prev预设代理",
+        description="应用prev预设时切换到代理贴图，应用其他预设时切回原图",
+        items=PROXY_PREV_LEVELS,
+        default='OFF'
+    )  # type: ignore
+    audit_items: CollectionProperty(type=TextureAuditItem)  # type: ignore
+    audit_index: IntProperty(default=0)  # type: ignore
+    audit_view: EnumProperty(
+        name="查看",
+        items=AUDIT_KINDS,
+        default='IMAGE'
+    )  # type: ignore
+    audit_sort: EnumProperty(
+        name="排序",
+        items=AUDIT_SORTS,
+        default='GPU'
+    )  # type: ignore
+    search_query: StringProperty(
+        name="搜索",
+        description="按名称/路径模糊搜索贴图、材质和物体",
+        default="",
+        update=update_search
+    )  # type: ignore
+    search_kind: EnumProperty(
+        name="类型",
+        items=SEARCH_KINDS,
+        default='ALL',
+        update=update_search
+    )  # type: ignore
+    filter_unused: BoolProperty(
+        name="未使用",
+        description="只显示没有被任何材质/世界/灯光/几何节点使用的贴图",
+        default=False,
+        update=update_search
+    )  # type: ignore
+    filter_missing: BoolProperty(
+        name="丢失",
+        description="只显示文件丢失的贴图",
+        default=False,
+        update=update_search
+    )  # type: ignore
+    filter_large: BoolProperty(
+        name=">4K",
+        description="只显示尺寸大于4096的贴图",
+        default=False,
+        update=update_search
+    )  # type: ignore
+    filter_packed: BoolProperty(
+        name="打包",
+        description="只显示打包在工程内的贴图",
+        default=False,
+        update=update_search
+    )  # type: ignore
+    search_results: CollectionProperty(type=TextureSearchResult)  # type: ignore
+    search_index: IntProperty(default=0)  # type: ignore
+    search_page: IntProperty(default=0, min=0)  # type: ignore
+    search_total: IntProperty(default=0)  # type: ignore
 
 
 class INDEX_OT_build_texture_index(Operator):
     bl_idname = "index.build_texture_index"
     bl_label = "建立or刷新 贴图-材质 索引"
-    bl_description = "扫描所有材质并建立贴图与材质的对应关系索引"
+    bl_description = "强制重新扫描所有材质、世界、灯光和几何节点（包含节点组内部，索引平时会随修改自动更新）"
 
     def execute(self, context):
-        global texture_material_index
-        texture_material_index = {}
-
-        # 遍历所有材质
-        for mat in bpy.data.materials:
-            if not mat.use_nodes:
-                continue
-
-            # 遍历材质节点
-            for node in mat.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    image_name = node.image.name
-
-                    # 添加到索引
-                    if image_name not in texture_material_index:
-                        texture_material_index[image_name] = []
-
-                    if mat.name not in texture_material_index[image_name]:
-                        texture_material_index[image_name].append(mat.name)
-
-        self.report({'INFO'}, f"索引建立完成，共索引 {len(texture_material_index)} 张贴图")
+        build_full_index()
+        self.report({'INFO'}, f"索引建立完成，共索引 {len(image_owners)} 张贴图")
         return {'FINISHED'}
 
 
 class INDEX_OT_find_materials(Operator):
     bl_idname = "index.find_materials"
     bl_label = "查找使用贴图的材质"
-    bl_description = "查找使用选定贴图的所有材质"
+    bl_description = "查找使用选定贴图的所有材质（以及世界、灯光、几何节点物体）"
+
+    OWNER_LABELS = {'MATERIAL': "材质", 'WORLD': "世界",
+                    'LIGHT': "灯光", 'OBJECT': "几何节点物体"}
 
     def execute(self, context):
         props = context.scene.texture_search_props
         selected_image = props.texture_search_image
-        global texture_material_index
-
-        if not texture_material_index:
-            self.report({'WARNING'}, "请先建立贴图索引!")
-            return {'CANCELLED'}
 
         if not selected_image:
             self.report({'WARNING'}, "请选择一张贴图!")
             return {'CANCELLED'}
 
-        if selected_image not in texture_material_index:
+        # 索引由depsgraph增量维护，首次查询时自动建立
+        owners = get_image_owners(selected_image)
+        if not owners:
             self.report({'INFO'}, f"贴图 '{selected_image}' 未被任何材质使用")
             return {'FINISHED'}
 
-        materials = texture_material_index[selected_image]
-        self.report(
-            {'INFO'}, f"贴图 '{selected_image}' 被以下材质使用: {', '.join(materials)}")
+        materials = [name for kind, name in owners if kind == 'MATERIAL']
+        others = [f"{self.OWNER_LABELS[kind]}:{name}" for kind, name in owners if kind != 'MATERIAL']
+        message = f"贴图 '{selected_image}' 被以下材质使用: {', '.join(materials)}"
+        if others:
+            message += f"；其他: {', '.join(others)}"
+        self.report({'INFO'}, message)
 
         # 打印到控制台
         print(f"\n贴图 '{selected_image}' 使用情况:")
-        for mat in materials:
-            print(f"- {mat}")
+        for kind, name in owners:
+            print(f"- [{self.OWNER_LABELS[kind]}] {name}")
 
         return {'FINISHED'}
@@ -0,0 +1,197 @@
+import os
+import json
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import bpy  # type: ignore
+from bpy.props import EnumProperty  # type: ignore
+from bpy.types import Operator  # type: ignore
+from .TextureAudit import image_abspath  # type: ignore
+from .TextureDedupe import file_hash  # type: ignore
+from .TextureIndex import ensure_index, image_owners  # type: ignore
+
+# --------------------------
+# 代理贴图：按源文件哈希在缓存目录生成 1/2、1/4、1/8 的缩小版本，
+# 一键把贴图数据块在原图和代理之间切换（所有TEX_IMAGE节点随之切换）
+# --------------------------
+
+PROXY_FACTORS = (2, 4, 8)
+FULL_PATH_PROP = "stool_full_path"
+HASH_PROP = "stool_source_hash"
+
+PROXY_PREV_LEVELS = [
+    ('OFF', "不切换", "应用预设时不切换代理贴图"),
+    ('2', "1/2", "prev预设使用1/2代理"),
+    ('4', "1/4", "prev预设使用1/4代理"),
+    ('8', "1/8", "prev预设使用1/8代理"),
+]
+
+PROXY_LEVELS = [
+    ('1', "原图", "使用原始分辨率贴图"),
+    ('2', "1/2", "使用1/2分辨率代理"),
+    ('4', "1/4", "使用1/4分辨率代理"),
+    ('8', "1/8", "使用1/8分辨率代理"),
+]
+
+# 后台Blender进程中执行的缩放脚本：读取任务json，每张图加载一次，依次生成各级代理
+_WORKER_SCRIPT = """
+import bpy, json, sys
+tasks = json.load(open(sys.argv[sys.argv.index('--') + 1], encoding='utf-8'))
+for src, outputs in tasks:
+    try:
+        image = bpy.data.images.load(src)
+        width, height = image.size
+        for factor, dst in outputs:
+            proxy = image.copy()
+            proxy.scale(max(1, width // factor), max(1, height // factor))
+            proxy.filepath_raw = dst
+            proxy.save()
+            bpy.data.images.remove(proxy)
+        bpy.data.images.remove(image)
+    except Exception as e:
+        print(f"proxy failed: {src}: {e}")
+"""
+
+
+def proxy_cache_dir(scene):
+    path = scene.texture_search_props.proxy_dir
+    if path.startswith("//") and not bpy.data.filepath:
+        return os.path.join(tempfile.gettempdir(), "stool_proxies")
+    return bpy.path.abspath(path)
+
+
+def proxy_path(cache_dir, digest, factor, source):
+    ext = os.path.splitext(source)[1] or ".png"
+    return os.path.join(cache_dir, f"{digest}_{factor}{ext}")
+
+
+def _source_path(image):
+    """原图路径：切换到代理后，原路径保存在自定义属性中"""
+    if FULL_PATH_PROP in image:
+        return bpy.path.abspath(image[FULL_PATH_PROP], library=image.library)
+    return image_abspath(image)
+
+
+def used_file_images():
+    """贴图索引中被使用、且有磁盘文件的普通贴图（不处理打包和UDIM）"""
+    ensure_index()
+    images = []
+    for name in image_owners:
+        image = bpy.data.images.get(name)
+        if image and image.source == 'FILE' and not image.packed_file:
+            images.append(image)
+    return images
+
+
+def _run_workers(tasks, workers):
+    """把任务切成 workers 份，并行启动后台Blender进程执行"""
+    batches = [tasks[i::workers] for i in range(workers)]
+    processes = []
+    temp_files = []
+    for batch in batches:
+        if not batch:
+            continue
+        fd, task_path = tempfile.mkstemp(suffix=".json", prefix="stool_proxy_")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(batch, f)
+        temp_files.append(task_path)
+        processes.append(subprocess.Popen([
+            bpy.app.binary_path, '-b', '--factory-startup',
+            '--python-expr', _WORKER_SCRIPT, '--', task_path,
+        ]))
+    for process in processes:
+        process.wait()
+    for path in temp_files:
+        os.remove(path)
+
+
+def generate_proxies(scene, images):
+    """为贴图生成缺失的代理，返回生成的文件数"""
+    cache_dir = proxy_cache_dir(scene)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    sources = {image.name: _source_path(image) for image in images}
+    unique_sources = sorted({p for p in sources.values() if os.path.exists(p)})
+    with ThreadPoolExecutor() as executor:
+        hashes = dict(zip(unique_sources, executor.map(file_hash, unique_sources)))
+
+    tasks = []
+    queued = set()
+    for image in images:
+        source = sources[image.name]
+        digest = hashes.get(source)
+        if not digest:
+            continue
+        image[HASH_PROP] = digest
+        outputs = [(factor, proxy_path(cache_dir, digest, factor, source))
+                   for factor in PROXY_FACTORS]
+        outputs = [(f, dst) for f, dst in outputs if not os.path.exists(dst)]
+        if outputs and source not in queued:
+            queued.add(source)
+            tasks.append((source, outputs))
+
+    if tasks:
+        _run_workers(tasks, max(1, min(os.cpu_count() or 1, 8, len(tasks))))
+    return sum(len(outputs) for _, outputs in tasks)
+
+
+def set_proxy_level(scene, level):
+    """切换贴图到指定代理级别（1为原图），返回切换的贴图数"""
+    cache_dir = proxy_cache_dir(scene)
+    switched = 0
+    for image in bpy.data.images:
+        if level == 1:
+            if FULL_PATH_PROP in image:
+                image.filepath = image[FULL_PATH_PROP]
+                del image[FULL_PATH_PROP]
+                switched += 1
+            continue
+        digest = image.get(HASH_PROP)
+        if not digest or image.source != 'FILE' or image.packed_file:
+            continue
+        source = _source_path(image)
+        target = proxy_path(cache_dir, digest, level, source)
+        if not os.path.exists(target):
+            continue
+        if FULL_PATH_PROP not in image:
+            image[FULL_PATH_PROP] = image.filepath
+        image.filepath = target
+        switched += 1
+    return switched
+
+
+def apply_proxy_for_preset(scene, preset_type):
+    """应用渲染预设时调用：prev预设使用设定的代理级别，其他预设切回原图"""
+    level = scene.texture_search_props.proxy_prev_level
+    if level == 'OFF':
+        return
+    set_proxy_level(scene, int(level) if preset_type == 'prev' else 1)
+
+
+class INDEX_OT_generate_texture_proxies(Operator):
+    bl_idname = "index.generate_texture_proxies"
+    bl_label = "生成代理贴图"
+    bl_description = "为所有被使用的贴图生成1/2、1/4、1/8代理（后台多进程），按源文件哈希缓存"
+
+    def execute(self, context):
+        images = used_file_images()
+        if not images:
+            self.report({'INFO'}, "没有需要生成代理的贴图")
+            return {'FINISHED'}
+        count = generate_proxies(context.scene, images)
+        self.report({'INFO'}, f"已生成 {count} 个代理文件（{len(images)} 张贴图）")
+        return {'FINISHED'}
+
+
+class INDEX_OT_switch_texture_proxy(Operator):
+    bl_idname = "index.switch_texture_proxy"
+    bl_label = "切换代理贴图"
+    bl_description = "把所有贴图切换到原图或指定级别的代理"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    level: EnumProperty(items=PROXY_LEVELS, default='1')  # type: ignore
+
+    def execute(self, context):
+        switched = set_proxy_level(context.scene, int(self.level))
+        self.report({'INFO'}, f"已切换 {switched} 张贴图")
+        return {'FINISHED'}
@@ -0,0 +1,100 @@
+import bpy  # type: ignore
+from bpy.props import BoolProperty  # type: ignore
+from bpy.types import Operator  # type: ignore
+from .TextureAudit import image_cost, MB  # type: ignore
+from .TextureIndex import ensure_index, image_owners, invalidate as invalidate_texture_index  # type: ignore
+
+# --------------------------
+# 清理未使用的贴图/材质：bpy.data.user_map 得到每个数据块的使用者，
+# 反复迭代到不动点——只被“已判定无用”的数据块使用的也是无用的（材质 -> 节点组 -> 贴图）
+# 伪用户、世界、笔刷、驱动器等非候选类型的使用者都视为有效使用
+# --------------------------
+
+# 渲染结果/合成器预览不是真正的贴图数据
+_SKIP_IMAGE_TYPES = {'RENDER_RESULT', 'COMPOSITING'}
+
+
+def _candidates():
+    images = [image for image in bpy.data.images if image.type not in _SKIP_IMAGE_TYPES]
+    return images + list(bpy.data.materials) + list(bpy.data.node_groups)
+
+
+def find_unused():
+    """返回没有有效使用者的数据块集合（贴图、材质、节点组）"""
+    candidates = [id_data for id_data in _candidates()
+                  if not id_data.use_fake_user and not id_data.library]
+    user_map = bpy.data.user_map(subset=candidates)
+
+    dead = set()
+    changed = True
+    while changed:
+        changed = False
+        for id_data in candidates:
+            if id_data in dead:
+                continue
+            users = user_map.get(id_data, ())
+            if all(user in dead or user == id_data for user in users):
+                dead.add(id_data)
+                changed = True
+
+    # 保险：贴图索引中仍被存活的材质/世界/灯光/物体使用的贴图不清理
+    ensure_index()
+    dead_materials = {m.name for m in dead if isinstance(m, bpy.types.Material)}
+    for image in [i for i in dead if isinstance(i, bpy.types.Image)]:
+        owners = image_owners.get(image.name, ())
+        if any(kind != 'MATERIAL' or name not in dead_materials for kind, name in owners):
+            dead.discard(image)
+    return dead
+
+
+def reclaimed_memory(images):
+    """估算删除这些贴图可回收的 (内存, 显存) 字节数"""
+    ram = gpu = 0
+    for image in images:
+        image_ram, image_gpu = image_cost(image)
+        ram += image_ram
+        gpu += image_gpu
+    return ram, gpu
+
+
+class INDEX_OT_purge_unused(Operator):
+    bl_idname = "index.purge_unused"
+    bl_label = "清理未使用的贴图和材质"
+    bl_description = "查找没有有效使用者的贴图、材质和节点组（考虑伪用户、节点组、世界、笔刷和驱动器），批量删除"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    dry_run: BoolProperty(  # type: ignore
+        name="仅预览",
+        description="只输出将被删除的数据块和可回收的内存，不做修改",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+    def execute(self, context):
+        dead = find_unused()
+        if not dead:
+            self.report({'INFO'}, "没有未使用的贴图和材质")
+            return {'FINISHED'}
+
+        images = sorted((i for i in dead if isinstance(i, bpy.types.Image)), key=lambda i: i.name)
+        materials = sorted((m for m in dead if isinstance(m, bpy.types.Material)), key=lambda m: m.name)
+        groups = sorted((g for g in dead if isinstance(g, bpy.types.NodeTree)), key=lambda g: g.name)
+        ram, gpu = reclaimed_memory(images)
+
+        print("\n未使用的数据块:")
+        for label, items in (("贴图", images), ("材质", materials), ("节点组", groups)):
+            for id_data in items:
+                print(f"- [{label}] {id_data.name}")
+        summary = (f"{len(images)} 张贴图、{len(materials)} 个材质、{len(groups)} 个节点组，"
+                   f"可回收内存约 {ram / MB:.0f} MB，显存约 {gpu / MB:.0f} MB")
+
+        if self.dry_run:
+            self.report({'INFO'}, f"[预览] {summary}（详见控制台）")
+            return {'FINISHED'}
+
+        bpy.data.batch_remove(list(dead))
+        invalidate_texture_index()
+        self.report({'INFO'}, f"已删除 {summary}")
+        return {'FINISHED'}
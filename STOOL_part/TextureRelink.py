@@ -0,0 +1,199 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import bpy  # type: ignore
+from bpy.props import BoolProperty  # type: ignore
+from bpy.types import Operator  # type: ignore
+
+# --------------------------
+# 丢失贴图重新链接：线程池并行scandir建立 文件名->路径 索引（按目录mtime缓存到磁盘），
+# 一次性解析所有丢失贴图，支持UDIM和大小写不敏感匹配
+# --------------------------
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "stool_relink_cache")
+
+# 文件名中的UDIM编号（1001-1999）
+_UDIM_RE = re.compile(r"(?<=[._])1\d{3}(?=\.)")
+
+
+def _scan_dir(path):
+    """线程中执行：返回 (目录mtime, 文件名列表, 子目录列表)"""
+    files, dirs = [], []
+    try:
+        mtime = os.stat(path).st_mtime
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return mtime, files, dirs
+
+
+def _cache_path(root):
+    digest = hashlib.blake2b(os.path.normcase(root).encode('utf-8'), digest_size=12).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def _load_cache(root):
+    try:
+        with open(_cache_path(root), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(root, tree):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(_cache_path(root), 'w', encoding='utf-8') as f:
+            json.dump(tree, f)
+    except OSError as e:
+        print(f"无法写入文件索引缓存: {e}")
+
+
+def _cached_or_scan(path, cached):
+    """目录mtime未变时直接用缓存（只需一次stat），否则重新scandir"""
+    entry = cached.get(path)
+    if entry:
+        try:
+            if os.stat(path).st_mtime == entry[0]:
+                return entry
+        except OSError:
+            return None
+    return _scan_dir(path)
+
+
+def scan_root(root, executor):
+    """并行遍历一个搜索根目录，返回 {目录: [mtime, 文件名列表, 子目录列表]}"""
+    cached = _load_cache(root)
+    tree = {}
+    pending = {executor.submit(_cached_or_scan, root, cached): root}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            path = pending.pop(future)
+            result = future.result()
+            if result is None:
+                continue
+            tree[path] = list(result)
+            for name in result[2]:
+                sub = os.path.join(path, name)
+                pending[executor.submit(_cached_or_scan, sub, cached)] = sub
+    _save_cache(root, tree)
+    return tree
+
+
+def build_name_index(roots):
+    """返回 (文件名小写 -> 路径列表, UDIM模式名小写 -> 目录列表)"""
+    names = {}
+    udims = {}
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for root in roots:
+            for directory, (_, files, _) in scan_root(root, executor).items():
+                for file_name in files:
+                    lower = file_name.lower()
+                    names.setdefault(lower, []).append(os.path.join(directory, file_name))
+                    pattern = _UDIM_RE.sub('<udim>', lower)
+                    if pattern != lower:
+                        udims.setdefault(pattern, set()).add(directory)
+    return names, udims
+
+
+def _best_match(candidates, original):
+    """多个候选时，优先选择原路径末尾目录结构最相似、且文件名大小写完全一致的"""
+    original_parts = original.replace('\\', '/').lower().split('/')
+    base = os.path.basename(original.replace('\\', '/'))
+
+    def score(path):
+        parts = path.replace('\\', '/').lower().split('/')
+        common = 0
+        for a, b in zip(reversed(parts), reversed(original_parts)):
+            if a != b:
+                break
+            common += 1
+        return (os.path.basename(path) == base, common)
+    return max(candidates, key=score)
+
+
+def is_missing(image):
+    if image.packed_file or image.source not in ('FILE', 'SEQUENCE', 'TILED'):
+        return False
+    path = bpy.path.abspath(image.filepath, library=image.library)
+    if image.source == 'TILED':
+        return not any(os.path.exists(path.replace('<UDIM>', str(tile.number)))
+                       for tile in image.tiles)
+    return not os.path.exists(path)
+
+
+def resolve_missing(images, names, udims):
+    """返回 {贴图名: 新路径}"""
+    resolved = {}
+    for image in images:
+        original = image.filepath.replace('\\', '/')
+        base = os.path.basename(original)
+        if '<UDIM>' in base:
+            directories = udims.get(base.lower())
+            if directories:
+                best_dir = _best_match(directories, os.path.dirname(original))
+                resolved[image.name] = os.path.join(best_dir, base)
+            continue
+        candidates = names.get(base.lower())
+        if candidates:
+            resolved[image.name] = _best_match(candidates, original)
+    return resolved
+
+
+class INDEX_OT_relink_missing_images(Operator):
+    bl_idname = "index.relink_missing_images"
+    bl_label = "重新链接丢失贴图"
+    bl_description = "在搜索目录中按文件名查找所有丢失的贴图并一次性重新链接（支持UDIM，大小写不敏感）"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    use_relative: BoolProperty(  # type: ignore
+        name="使用相对路径",
+        description="工程已保存时，把新路径写为相对路径",
+        default=True
+    )
+
+    def execute(self, context):
+        props = context.scene.texture_search_props
+        roots = [bpy.path.abspath(p.strip()) for p in props.relink_roots.split(';') if p.strip()]
+        roots = [os.path.normpath(p) for p in roots if os.path.isdir(p)]
+        if not roots:
+            self.report({'WARNING'}, "请先填写有效的搜索目录（多个目录用 ; 分隔）")
+            return {'CANCELLED'}
+
+        missing = [image for image in bpy.data.images if is_missing(image)]
+        if not missing:
+            self.report({'INFO'}, "没有丢失的贴图")
+            return {'FINISHED'}
+
+        names, udims = build_name_index(roots)
+        resolved = resolve_missing(missing, names, udims)
+
+        relative = self.use_relative and bool(bpy.data.filepath)
+        for image_name, path in resolved.items():
+            image = bpy.data.images[image_name]
+            if relative:
+                try:
+                    path = bpy.path.relpath(path)
+                except ValueError:
+                    pass  # 不同盘符无法转为相对路径
+            image.filepath = path
+
+        unresolved = [image.name for image in missing if image.name not in resolved]
+        if unresolved:
+            print("\n未找到的贴图:")
+            for name in unresolved:
+                print(f"- {name}: {bpy.data.images[name].filepath}")
+        self.report({'INFO'}, f"已重新链接 {len(resolved)} / {len(missing)} 张丢失贴图")
+        return {'FINISHED'}
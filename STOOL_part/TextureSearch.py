@@ -0,0 +1,322 @@
+import os
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import bpy  # type: ignore
+from bpy.props import StringProperty, EnumProperty, IntProperty  # type: ignore
+from bpy.types import Operator, PropertyGroup, UIList  # type: ignore
+from .ImageHeaders import read_image_header  # type: ignore
+from .TextureAudit import image_abspath  # type: ignore
+from .TextureRelink import is_missing  # type: ignore
+from .TextureIndex import ensure_index, index_built, index_generation, image_owners, get_material_objects  # type: ignore
+
+# --------------------------
+# 贴图面板搜索：贴图/材质/物体名称和贴图路径的三元组(trigram)倒排索引，
+# 随贴图索引一起重建；支持模糊排序、过滤（未使用/丢失/大于4K/打包）和分页
+# --------------------------
+
+PAGE_SIZE = 50
+LARGE_SIZE = 4096
+# 参与排序的最大候选数，避免过短的查询在大文件里排序全部物体
+MAX_CANDIDATES = 5000
+
+SEARCH_KINDS = [
+    ('ALL', "全部", "搜索贴图、材质和物体"),
+    ('IMAGE', "贴图", "只搜索贴图"),
+    ('MATERIAL', "材质", "只搜索材质"),
+    ('OBJECT', "物体", "只搜索物体"),
+]
+
+KIND_ICONS = {'IMAGE': 'IMAGE_DATA', 'MATERIAL': 'MATERIAL', 'OBJECT': 'OBJECT_DATA'}
+
+# 搜索索引：entries[i] = (类型, 名称, 小写名称, 小写路径)
+_search = {'key': None, 'entries': [], 'grams': {}, 'sorted_names': []}
+# 完整的排序结果，面板列表只放当前页
+_results = []
+# 文件路径 -> (mtime, 宽, 高)，大于4K过滤使用
+_size_cache = {}
+
+
+class TextureSearchResult(PropertyGroup):
+    kind: EnumProperty(items=SEARCH_KINDS[1:], default='IMAGE')  # type: ignore
+    detail: StringProperty()  # type: ignore
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _names_checksum(collection):
+    """改名不改变数量，名称列表的哈希用来发现改名（keys() 在C中取出全部名称）"""
+    return hash(tuple(collection.keys()))
+
+
+def _search_key():
+    data = bpy.data
+    return (index_built(), index_generation(),
+            _names_checksum(data.images), _names_checksum(data.materials),
+            _names_checksum(data.objects))
+
+
+def build_search_index():
+    """建立名称/路径的三元组倒排索引：三元组 -> 条目序号列表"""
+    entries = []
+    for image in bpy.data.images:
+        entries.append(('IMAGE', image.name, image.name.lower(), image.filepath.lower()))
+    for material in bpy.data.materials:
+        entries.append(('MATERIAL', material.name, material.name.lower(), ""))
+    for obj in bpy.data.objects:
+        entries.append(('OBJECT', obj.name, obj.name.lower(), ""))
+
+    grams = {}
+    for i, (_, _, name, path) in enumerate(entries):
+        keys = trigrams(name)
+        if path:
+            keys |= trigrams(os.path.basename(path.replace('\\', '/')))
+        for gram in keys:
+            grams.setdefault(gram, []).append(i)
+
+    _search['entries'] = entries
+    _search['grams'] = grams
+    _search['sorted_names'] = sorted((name, i) for i, (_, _, name, _) in enumerate(entries))
+    _search['key'] = _search_key()
+
+
+def ensure_search_index():
+    # 每次搜索都先核对贴图索引：撤销/打开工程后索引失效，"未使用"过滤依赖它
+    ensure_index()
+    if _search['key'] != _search_key():
+        build_search_index()
+
+
+def _score(query, name, path, shared, gram_count):
+    """三元组重合度为基础分，完全一致/前缀/包含依次加分，名称越短越靠前"""
+    score = shared / gram_count
+    if name == query:
+        score += 3
+    elif name.startswith(query):
+        score += 2
+    elif query in name:
+        score += 1
+    elif query in path:
+        score += 0.5
+    return score - len(name) * 0.001
+
+
+def _candidates(query):
+    """返回 {条目序号: 共同三元组数}；短查询用有序名称做前缀查找 + 线性包含匹配"""
+    entries = _search['entries']
+    if len(query) < 3:
+        names = _search['sorted_names']
+        found = {}
+        start = bisect_left(names, (query, -1))
+        for name, i in names[start:]:
+            if not name.startswith(query):
+                break
+            found[i] = 1
+        for i, (_, _, name, path) in enumerate(entries):
+            if len(found) >= MAX_CANDIDATES:
+                break
+            if i not in found and (query in name or query in path):
+                found[i] = 1
+        return found
+
+    counts = Counter()
+    for gram in trigrams(query):
+        counts.update(_search['grams'].get(gram, ()))
+    # 至少命中一半三元组才算候选，容忍少量拼写错误
+    threshold = max(1, len(trigrams(query)) // 2)
+    return {i: n for i, n in counts.items() if n >= threshold}
+
+
+def _image_size(image):
+    if image.has_data:
+        return tuple(image.size)
+    path = image_abspath(image)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return (0, 0)
+    cached = _size_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1:]
+    return None
+
+
+def _large_images(names):
+    """尺寸任意一边超过4K的贴图；未加载的贴图在线程池中只读文件头"""
+    sizes = {}
+    pending = {}
+    for name in names:
+        image = bpy.data.images.get(name)
+        if not image:
+            continue
+        size = _image_size(image)
+        if size is None:
+            pending[name] = image_abspath(image)
+        else:
+            sizes[name] = size
+    if pending:
+        paths = sorted(set(pending.values()))
+        with ThreadPoolExecutor() as executor:
+            headers = dict(zip(paths, executor.map(read_image_header, paths)))
+        for path, info in headers.items():
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            size = (info['width'], info['height']) if info else (0, 0)
+            _size_cache[path] = (mtime, *size)
+        for name, path in pending.items():
+            cached = _size_cache.get(path)
+            sizes[name] = cached[1:] if cached else (0, 0)
+    return {name for name, (w, h) in sizes.items() if max(w, h) > LARGE_SIZE}
+
+
+def _image_filters(props):
+    return [flag for flag in ('filter_unused', 'filter_missing', 'filter_large', 'filter_packed')
+            if getattr(props, flag)]
+
+
+def search(props):
+    """返回排序后的 [(类型, 名称, 说明)]"""
+    ensure_search_index()
+    entries = _search['entries']
+    query = props.search_query.strip().lower()
+    filters = _image_filters(props)
+    kind = 'IMAGE' if filters else props.search_kind
+
+    if query:
+        found = _candidates(query)
+        gram_count = max(len(trigrams(query)), 1)
+        ranked = [(_score(query, entries[i][2], entries[i][3], n, gram_count), i)
+                  for i, n in found.items()
+                  if kind == 'ALL' or entries[i][0] == kind]
+    else:
+        ranked = [(0, i) for i, entry in enumerate(entries) if kind == 'ALL' or entry[0] == kind]
+
+    if filters:
+        images = bpy.data.images
+        keep = [i for _, i in ranked if entries[i][1] in images]
+        if 'filter_unused' in filters:
+            keep = [i for i in keep if entries[i][1] not in image_owners]
+        if 'filter_packed' in filters:
+            keep = [i for i in keep if images[entries[i][1]].packed_file]
+        if 'filter_missing' in filters:
+            keep = [i for i in keep if is_missing(images[entries[i][1]])]
+        if 'filter_large' in filters:
+            large = _large_images([entries[i][1] for i in keep])
+            keep = [i for i in keep if entries[i][1] in large]
+        kept = set(keep)
+        ranked = [item for item in ranked if item[1] in kept]
+
+    if query:
+        ranked = heapq.nlargest(MAX_CANDIDATES, ranked)
+    else:
+        ranked.sort(key=lambda item: entries[item[1]][2])
+
+    sources = {'IMAGE': bpy.data.images, 'MATERIAL': bpy.data.materials,
+               'OBJECT': bpy.data.objects}
+    results = []
+    for _, i in ranked:
+        entry_kind, name, _, _ = entries[i]
+        id_data = sources[entry_kind].get(name)
+        if not id_data:
+            continue  # 索引建立后被重命名/删除
+        detail = bpy.path.basename(id_data.filepath) if entry_kind == 'IMAGE' else ""
+        results.append((entry_kind, name, detail))
+    return results
+
+
+def fill_page(props):
+    """把当前页的结果写入面板列表"""
+    page_count = max(1, (len(_results) + PAGE_SIZE - 1) // PAGE_SIZE)
+    props.search_page = min(max(props.search_page, 0), page_count - 1)
+    items = props.search_results
+    items.clear()
+    start = props.search_page * PAGE_SIZE
+    for kind, name, detail in _results[start:start + PAGE_SIZE]:
+        item = items.add()
+        item.kind = kind
+        item.name = name
+        item.detail = detail
+    props.search_total = len(_results)
+
+
+def run_search(props):
+    _results[:] = search(props)
+    props.search_page = 0
+    fill_page(props)
+
+
+def update_search(self, context):
+    """搜索框/过滤条件变化时的回调"""
+    run_search(self)
+
+
+class INDEX_OT_texture_search(Operator):
+    bl_idname = "index.texture_search"
+    bl_label = "搜索"
+    bl_description = "按名称/路径模糊搜索贴图、材质和物体"
+
+    def execute(self, context):
+        run_search(context.scene.texture_search_props)
+        return {'FINISHED'}
+
+
+class INDEX_OT_texture_search_page(Operator):
+    bl_idname = "index.texture_search_page"
+    bl_label = "翻页"
+    bl_description = "切换搜索结果页"
+
+    delta: IntProperty(default=1)  # type: ignore
+
+    def execute(self, context):
+        props = context.scene.texture_search_props
+        props.search_page += self.delta
+        fill_page(props)
+        return {'FINISHED'}
+
+
+class INDEX_OT_use_search_result(Operator):
+    bl_idname = "index.use_search_result"
+    bl_label = "使用搜索结果"
+    bl_description = "贴图：设为要查找的贴图；材质：选中使用该材质的物体；物体：选中该物体"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    kind: StringProperty()  # type: ignore
+    name: StringProperty()  # type: ignore
+
+    def execute(self, context):
+        props = context.scene.texture_search_props
+        if self.kind == 'IMAGE':
+            props.texture_search_image = self.name
+            return {'FINISHED'}
+
+        names = get_material_objects(self.name) if self.kind == 'MATERIAL' else {self.name}
+        layer_objects = context.view_layer.objects
+        targets = [obj for obj in map(layer_objects.get, names) if obj]
+        if not targets:
+            self.report({'INFO'}, "当前视图层中没有可选中的物体")
+            return {'CANCELLED'}
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in targets:
+            obj.select_set(True)
+        context.view_layer.objects.active = targets[0]
+        self.report({'INFO'}, f"已选中 {len(targets)} 个物体")
+        return {'FINISHED'}
+
+
+class INDEX_UL_texture_search(UIList):
+    """搜索结果（当前页）"""
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon=KIND_ICONS[item.kind])
+        if item.detail:
+            row.label(text=item.detail)
+        op = row.operator("index.use_search_result", text="", icon='RESTRICT_SELECT_OFF')
+        op.kind = item.kind
+        op.name = item.name
@@ -0,0 +1,113 @@
+"""渲染农场任务执行脚本（由"导出渲染农场任务"生成的json驱动）
+
+命令行（无界面，Linux/Windows/macOS均可）:
+    python farm_runner.py job.json                 # 依次渲染所有分块
+    python farm_runner.py job.json --chunk 3       # 只渲染第3块（给农场管理器用）
+    python farm_runner.py job.json --list          # 列出分块
+    python farm_runner.py job.json --blender /opt/blender/blender
+
+Blender路径优先使用 --blender，其次环境变量 BLENDER，最后是PATH中的 blender。
+本脚本同时也作为Blender内的设置脚本使用：以 --python 传给Blender时，会把任务中的渲染设置应用到场景上。
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+
+
+def load_job(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def apply_job_settings(job):
+    """在Blender内部运行：把任务里的预设设置应用到场景"""
+    import bpy  # type: ignore
+
+    scene = bpy.data.scenes.get(job['scene']) or bpy.context.scene
+    cam = bpy.data.objects.get(job['camera'])
+    if cam:
+        scene.camera = cam
+
+    settings = job['settings']
+    render = scene.render
+    render.resolution_x = settings['resolution_x']
+    render.resolution_y = settings['resolution_y']
+    render.resolution_percentage = settings['resolution_percentage']
+    render.filepath = job['output']
+    if job.get('engine'):
+        render.engine = job['engine']
+
+    if render.engine == 'CYCLES' and hasattr(scene, 'cycles'):
+        scene.cycles.samples = settings['samples']
+        # 0 表示不限时，同样写入，覆盖工程里保存的值
+        scene.cycles.time_limit = settings.get('time_limit') or 0.0
+    elif hasattr(scene, 'eevee'):
+        scene.eevee.taa_render_samples = settings['samples']
+
+
+def find_blender(explicit=None):
+    blender = explicit or os.environ.get('BLENDER') or shutil.which('blender')
+    if not blender:
+        sys.exit("找不到Blender，请使用 --blender 或设置环境变量 BLENDER")
+    return blender
+
+
+def chunk_command(blender, job_path, job, chunk):
+    """单个分块的Blender命令行；参数按顺序执行，--python 必须在 -a 之前"""
+    start, end = chunk
+    return [
+        blender, '-b', job['blend'],
+        '-S', job['scene'],
+        '--python', os.path.abspath(__file__),
+        '-s', str(start), '-e', str(end), '-j', str(job['settings']['frame_step']),
+        '-a',
+        '--', '--apply', os.path.abspath(job_path),
+    ]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="执行渲染农场任务")
+    parser.add_argument('job', help="任务json路径")
+    parser.add_argument('--chunk', type=int, help="只渲染指定分块（从0开始）")
+    parser.add_argument('--blender', help="Blender可执行文件路径")
+    parser.add_argument('--list', action='store_true', help="列出所有分块")
+    parser.add_argument('--dry-run', action='store_true', help="只打印命令，不执行")
+    args = parser.parse_args(argv)
+
+    job = load_job(args.job)
+    chunks = job['chunks']
+
+    if args.list:
+        for i, (start, end) in enumerate(chunks):
+            print(f"{i}: {start}-{end}")
+        return 0
+
+    if args.chunk is not None:
+        if not 0 <= args.chunk < len(chunks):
+            sys.exit(f"分块 {args.chunk} 超出范围 (共 {len(chunks)} 块)")
+        selected = [chunks[args.chunk]]
+    else:
+        selected = chunks
+
+    blender = find_blender(args.blender)
+    for chunk in selected:
+        cmd = chunk_command(blender, args.job, job, chunk)
+        print(" ".join(cmd), flush=True)
+        if args.dry_run:
+            continue
+        result = subprocess.run(cmd)
+        if result.returncode != 0:
+            print(f"分块 {chunk[0]}-{chunk[1]} 渲染失败，返回码 {result.returncode}")
+            return result.returncode
+    return 0
+
+
+if __name__ == "__main__":
+    if '--' in sys.argv and '--apply' in sys.argv:
+        # 由Blender以 --python 调用：只应用设置，渲染交给后续的 -a 参数
+        apply_job_settings(load_job(sys.argv[sys.argv.index('--apply') + 1]))
+    else:
+        sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,50 @@
+import os
+import sys
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from blender_env import load_addon, reset_scene, timed  # noqa: E402
+
+# --------------------------
+# 基准：10k个集合中查找摄像机所在集合，对比原先扫描 bpy.data.collections 的方式
+#   blender -b --factory-startup --python tests/bench_camera_collection.py
+# --------------------------
+
+COLLECTION_COUNT = 10000
+LOOKUPS = 100
+
+
+def scan_collections(camera_obj):
+    """原先的实现：逐个集合按名称查找"""
+    for coll in bpy.data.collections:
+        if camera_obj.name in coll.objects:
+            return coll
+    return None
+
+
+def main():
+    addon = load_addon()
+    from importlib import import_module
+    get_camera_collection = import_module(
+        addon.__name__ + ".STOOL_part.RenderOps").get_camera_collection
+
+    scene = reset_scene()
+    collections = [bpy.data.collections.new(f"Set_{i:05d}") for i in range(COLLECTION_COUNT)]
+    for coll in collections:
+        scene.collection.children.link(coll)
+    camera = bpy.data.objects.new("Cam", bpy.data.cameras.new("Cam"))
+    # 摄像机同时在主集合和最后一个集合中：查找结果应为普通集合
+    scene.collection.objects.link(camera)
+    collections[-1].objects.link(camera)
+
+    assert get_camera_collection(camera, scene) == collections[-1]
+    assert scan_collections(camera) == collections[-1]
+
+    scan_time, _ = timed(lambda: [scan_collections(camera) for _ in range(LOOKUPS)])
+    lookup_time, _ = timed(lambda: [get_camera_collection(camera, scene) for _ in range(LOOKUPS)])
+    print(f"{COLLECTION_COUNT} 个集合，各查找 {LOOKUPS} 次")
+    print(f"扫描 bpy.data.collections: {scan_time / LOOKUPS * 1000:.3f} ms/次")
+    print(f"users_collection:          {lookup_time / LOOKUPS * 1000:.3f} ms/次")
+
+
+main()
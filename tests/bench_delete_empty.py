@@ -0,0 +1,65 @@
+import os
+import sys
+import random
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from blender_env import load_addon, reset_scene, timed  # noqa: E402
+from empty_reference import legacy_empties_to_delete  # noqa: E402
+
+# --------------------------
+# 基准：合成的空物体层级（10%的叶子挂网格，少量集合实例），
+# 对比原始实现与单次后序遍历 + batch_remove
+#   blender -b --factory-startup --python tests/bench_delete_empty.py
+# 原始实现为 O(N²·深度)，只在较小的规模上运行
+# --------------------------
+
+SIZES = (10000, 100000)
+LEGACY_MAX = 10000
+# 每个集合放的物体数，避免单个集合过大
+PER_COLLECTION = 1000
+
+
+def build_hierarchy(count, seed=0):
+    rng = random.Random(seed)
+    scene = reset_scene()
+    mesh = bpy.data.meshes.new("BenchMesh")
+    instance_source = bpy.data.collections.new("BenchAsset")
+    objs = []
+    collection = None
+    for i in range(count):
+        if i % PER_COLLECTION == 0:
+            collection = bpy.data.collections.new(f"Bench_{i // PER_COLLECTION}")
+            scene.collection.children.link(collection)
+        roll = rng.random()
+        obj = bpy.data.objects.new(f"Obj_{i}", mesh if roll < 0.1 else None)
+        if 0.1 <= roll < 0.11:
+            obj.instance_type = 'COLLECTION'
+            obj.instance_collection = instance_source
+        collection.objects.link(obj)
+        # 大多数物体挂在最近创建的某个物体下，形成较深的链和分支
+        if objs and rng.random() < 0.9:
+            obj.parent = objs[rng.randrange(max(0, i - 50), i)]
+        objs.append(obj)
+    bpy.context.view_layer.update()
+
+
+def main():
+    load_addon()
+    for count in SIZES:
+        build_hierarchy(count)
+        empties = sum(1 for obj in bpy.data.objects if obj.type == 'EMPTY')
+        print(f"\n{count} 个物体（{empties} 个空物体）")
+
+        if count <= LEGACY_MAX:
+            legacy_time, legacy = timed(legacy_empties_to_delete)
+            print(f"原始实现查找:       {legacy_time:.3f} s（{len(legacy)} 个待删除）")
+
+        find_time, _ = timed(bpy.ops.object.delete_empty_null_visn, dry_run=True)
+        print(f"后序遍历查找(预览): {find_time:.3f} s")
+        before = len(bpy.data.objects)
+        delete_time, _ = timed(bpy.ops.object.delete_empty_null_visn, dry_run=False)
+        print(f"查找 + batch_remove: {delete_time:.3f} s（删除 {before - len(bpy.data.objects)} 个）")
+
+
+main()
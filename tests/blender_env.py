@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import traceback
+import importlib.util
+import bpy  # type: ignore
+
+# --------------------------
+# 测试/基准脚本的公共部分，需要在Blender中运行：
+#   blender -b --factory-startup --python-exit-code 1 --python tests/test_xxx.py
+# 直接从仓库加载插件包并注册小工具箱，不需要安装插件
+# --------------------------
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = "snapshot_3d_viewer"
+
+
+def load_addon():
+    """加载仓库中的插件包并注册STOOL，返回插件包模块"""
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+    spec = importlib.util.spec_from_file_location(
+        PACKAGE_NAME, os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = module
+    spec.loader.exec_module(module)
+    module.STOOL.register()
+    return module
+
+
+def reset_scene():
+    """清空物体和集合，每个用例从空场景开始"""
+    data = bpy.data
+    data.batch_remove(list(data.objects) + list(data.collections))
+    bpy.ops.outliner.orphans_purge(do_recursive=True)
+    return bpy.context.scene
+
+
+def select_only(objs, active=None):
+    view_layer = bpy.context.view_layer
+    for obj in view_layer.objects:
+        obj.select_set(False)
+    for obj in objs:
+        obj.select_set(True)
+    view_layer.objects.active = active or (objs[-1] if objs else None)
+
+
+def timed(func, *args, **kwargs):
+    """返回 (耗时秒数, 结果)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def run(tests):
+    """依次运行用例，输出结果；有失败时以非零状态退出（配合 --python-exit-code）"""
+    failed = 0
+    for test in tests:
+        reset_scene()
+        try:
+            test()
+        except Exception as e:
+            failed += 1
+            print(f"FAIL {test.__name__}: {e!r}")
+            traceback.print_exc()
+        else:
+            print(f"ok   {test.__name__}")
+    print(f"{len(tests) - failed}/{len(tests)} passed")
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,2 @@
+# 这里的脚本需要在Blender中运行（见 blender_env.py），pytest不收集
+collect_ignore_glob = ["*.py"]
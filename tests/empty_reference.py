@@ -0,0 +1,43 @@
+import bpy  # type: ignore
+
+# --------------------------
+# 删除无内容Empty 的原始实现（保留/删除规则的参照），测试和基准共用
+# 按层级排序后自底向上标记；成员判断为列表查找，复杂度 O(N²·深度)
+# --------------------------
+
+
+def is_collection_instance(obj):
+    return hasattr(obj, 'instance_type') and obj.instance_type == 'COLLECTION'
+
+
+def legacy_empties_to_delete():
+    empty_objects = [obj for obj in bpy.data.objects if obj.type == 'EMPTY']
+    if not empty_objects:
+        return []
+
+    should_keep = {obj: is_collection_instance(obj) for obj in empty_objects}
+
+    for obj in empty_objects:
+        if not should_keep[obj]:
+            for child in obj.children:
+                if child.type != 'EMPTY' or is_collection_instance(child):
+                    should_keep[obj] = True
+                    break
+
+    level_dict = {}
+    for obj in empty_objects:
+        level = 0
+        current = obj
+        while current.parent and current.parent in empty_objects:
+            current = current.parent
+            level += 1
+        level_dict[obj] = level
+
+    for obj in sorted(empty_objects, key=lambda x: level_dict[x], reverse=True):
+        if not should_keep[obj]:
+            for child in obj.children:
+                if child in should_keep and should_keep[child]:
+                    should_keep[obj] = True
+                    break
+
+    return [obj for obj in empty_objects if not should_keep[obj]]
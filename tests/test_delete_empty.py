@@ -0,0 +1,97 @@
+import os
+import sys
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from blender_env import load_addon, run  # noqa: E402
+from empty_reference import legacy_empties_to_delete  # noqa: E402
+
+# --------------------------
+# 删除无内容Empty：保留/删除规则与原始实现一致
+#   blender -b --factory-startup --python-exit-code 1 --python tests/test_delete_empty.py
+# --------------------------
+
+load_addon()
+
+
+def add(name, parent=None, kind='EMPTY'):
+    data = bpy.data.meshes.new(name) if kind == 'MESH' else None
+    obj = bpy.data.objects.new(name, data)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.parent = parent
+    return obj
+
+
+def add_instance(name, parent=None):
+    """集合实例空物体"""
+    obj = add(name, parent)
+    obj.instance_type = 'COLLECTION'
+    obj.instance_collection = bpy.data.collections.get("Asset") or bpy.data.collections.new("Asset")
+    return obj
+
+
+def run_operator(expected_deleted, dry_run=False):
+    """与原始实现对比，再执行操作符，检查剩下的物体"""
+    all_names = {obj.name for obj in bpy.data.objects}
+    legacy = {obj.name for obj in legacy_empties_to_delete()}
+    assert legacy == set(expected_deleted), f"原始实现: {sorted(legacy)}"
+    bpy.ops.object.delete_empty_null_visn(dry_run=dry_run)
+    remaining = {obj.name for obj in bpy.data.objects}
+    expected = all_names if dry_run else all_names - set(expected_deleted)
+    assert remaining == expected, f"剩余: {sorted(remaining)}，期望: {sorted(expected)}"
+
+
+def test_nested_empty_chain():
+    a = add("A")
+    b = add("B", a)
+    add("C", b)
+    add("Lone")
+    run_operator({"A", "B", "C", "Lone"})
+
+
+def test_empty_with_only_mesh_child():
+    holder = add("Holder")
+    add("Mesh", holder, kind='MESH')
+    run_operator(set())
+
+
+def test_collection_instances_are_kept():
+    add_instance("Instance")
+    wrapper = add("Wrapper")
+    add_instance("NestedInstance", wrapper)
+    run_operator(set())
+
+
+def test_empty_whose_child_is_a_kept_empty():
+    top = add("Top")
+    middle = add("Middle", top)
+    keeper = add("Keeper", middle)
+    add("Mesh", keeper, kind='MESH')
+    # 同一父级下：有内容的分支保留，没有内容的分支删除
+    dead = add("Dead", top)
+    add("DeadLeaf", dead)
+    run_operator({"Dead", "DeadLeaf"})
+
+
+def test_mesh_parent_with_empty_children():
+    mesh = add("Mesh", kind='MESH')
+    add("EmptyUnderMesh", mesh)
+    kept = add("KeptUnderMesh", mesh)
+    add("Child", kept, kind='MESH')
+    run_operator({"EmptyUnderMesh"})
+
+
+def test_dry_run_deletes_nothing():
+    a = add("A")
+    add("B", a)
+    run_operator({"A", "B"}, dry_run=True)
+
+
+run([
+    test_nested_empty_chain,
+    test_empty_with_only_mesh_child,
+    test_collection_instances_are_kept,
+    test_empty_whose_child_is_a_kept_empty,
+    test_mesh_parent_with_empty_children,
+    test_dry_run_deletes_nothing,
+])
@@ -0,0 +1,161 @@
+import os
+import sys
+from math import radians
+import bpy  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from blender_env import load_addon, select_only, run  # noqa: E402
+
+# --------------------------
+# 批量改父级：各操作符执行前后，所有物体的世界矩阵保持不变
+#   blender -b --factory-startup --python-exit-code 1 --python tests/test_reparent.py
+# --------------------------
+
+TOLERANCE = 1e-4
+
+addon = load_addon()
+Hierarchy = sys.modules[addon.__name__ + ".STOOL_part.Hierarchy"]
+
+
+def add(name, parent=None, location=(0, 0, 0), rotation=(0, 0, 0), scale=1.0, with_inverse=False):
+    """新建空物体；with_inverse 时像 Ctrl+P 一样写入父级逆矩阵（非单位矩阵）"""
+    obj = bpy.data.objects.new(name, None)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.location = location
+    obj.rotation_euler = [radians(angle) for angle in rotation]
+    obj.scale = (scale, scale, scale)
+    if parent:
+        obj.parent = parent
+        if with_inverse:
+            bpy.context.view_layer.update()
+            obj.matrix_parent_inverse = parent.matrix_world.inverted()
+    return obj
+
+
+def build_chain():
+    """G > P > C > D，P/C 带父级逆矩阵；S 为 C 的兄弟（同样带逆矩阵）"""
+    g = add("G", location=(3, -2, 1), rotation=(0, 0, 30), scale=2.0)
+    p = add("P", g, location=(1, 4, 0), rotation=(45, 0, 10), with_inverse=True)
+    c = add("C", p, location=(-2, 1, 3), rotation=(0, 20, 0), scale=0.5, with_inverse=True)
+    d = add("D", c, location=(0, 0, 2))
+    s = add("S", p, location=(5, 0, -1), rotation=(10, 10, 10), with_inverse=True)
+    return g, p, c, d, s
+
+
+def world_matrices():
+    bpy.context.view_layer.update()
+    return {obj.name: obj.matrix_world.copy() for obj in bpy.context.scene.objects}
+
+
+def assert_unchanged(before):
+    after = world_matrices()
+    for name, matrix in before.items():
+        if name not in after:
+            continue  # 已被删除
+        diff = max(abs(a - b) for row_a, row_b in zip(matrix, after[name]) for a, b in zip(row_a, row_b))
+        assert diff < TOLERANCE, f"{name} 的世界矩阵变化了 {diff}"
+
+
+def test_inverse_matrices_are_not_identity():
+    _, p, c, _, s = build_chain()
+    for obj in (p, c, s):
+        assert any(abs(a - b) > TOLERANCE
+                   for row_a, row_b in zip(obj.matrix_parent_inverse, ((1, 0, 0, 0), (0, 1, 0, 0),
+                                                                       (0, 0, 1, 0), (0, 0, 0, 1)))
+                   for a, b in zip(row_a, row_b)), f"{obj.name} 的父级逆矩阵是单位矩阵"
+
+
+def test_solo_pick():
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    select_only([p])
+    bpy.ops.object.solo_pick_visn()
+    assert_unchanged(before)
+    assert p.parent is None
+    assert c.parent == g and s.parent == g and d.parent == c
+
+
+def test_solo_pick_delete():
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    select_only([p])
+    bpy.ops.object.solo_pick_delete_visn()
+    assert "P" not in bpy.data.objects
+    assert_unchanged(before)
+    assert c.parent == g and s.parent == g
+
+
+def test_release_to_subparent():
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    select_only([p])
+    bpy.ops.object.release_all_children_to_subparent_visn()
+    assert_unchanged(before)
+    assert p.parent == g and c.parent == g and s.parent == g
+
+
+def test_parent_to_empty():
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    select_only([c, s])
+    bpy.ops.object.parent_to_empty_visn()
+    assert_unchanged(before)
+    assert c.parent == s.parent and c.parent not in (p, None)
+    assert c.parent.parent == p
+
+
+def test_parent_to_empty_individual():
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    select_only([c, s])
+    bpy.ops.object.parent_to_empty_visn_individual()
+    assert_unchanged(before)
+    assert c.parent != s.parent
+    assert c.parent.parent == p and s.parent.parent == p
+
+
+def test_batch_moves_parent_with_child():
+    # 同一批里父级和它的子级都移动：两者都放到世界层级
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    select_only([p, c])
+    bpy.ops.object.solo_pick_visn()
+    assert_unchanged(before)
+    assert p.parent is None and c.parent is None
+    assert d.parent == g and s.parent == g
+
+    # 子级先移到世界层级，原来的父级再挂到它下面
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    moved = Hierarchy.reparent([(c, None), (p, c)])
+    assert moved == 2
+    assert_unchanged(before)
+    assert c.parent is None and p.parent == c
+
+
+def test_cycle_is_skipped():
+    g, p, c, d, s = build_chain()
+    before = world_matrices()
+    # 把父级挂到自己的子孙下会形成循环，必须跳过
+    assert Hierarchy.reparent([(p, d)]) == 0
+    assert Hierarchy.reparent([(g, c)], Hierarchy.HierarchyIndex()) == 0
+    assert Hierarchy.reparent([(c, c)]) == 0
+    assert_unchanged(before)
+    assert g.parent is None and p.parent == g and c.parent == p
+
+    # 同一批中其余不形成循环的移动照常执行
+    assert Hierarchy.reparent([(p, d), (s, None)]) == 1
+    assert_unchanged(before)
+    assert p.parent == g and s.parent is None
+
+
+run([
+    test_inverse_matrices_are_not_identity,
+    test_solo_pick,
+    test_solo_pick_delete,
+    test_release_to_subparent,
+    test_parent_to_empty,
+    test_parent_to_empty_individual,
+    test_batch_moves_parent_with_child,
+    test_cycle_is_skipped,
+])